@@ -4,6 +4,8 @@
 import numpy as np
 from typing import List, Optional, Dict, Any
 
+from .core_modules import njit, HAS_NUMBA
+
 # ============ 合唱效果器 (Chorus) ============
 
 class Chorus:
@@ -275,6 +277,100 @@ class Compressor:
 
 # ============ 均衡器 (EQ) ============
 
+def _biquad_scan(signal: np.ndarray, b0: float, b1: float, b2: float,
+                 a1: float, a2: float) -> np.ndarray:
+    """
+    用前缀扫描 (associative scan) 计算biquad滤波 (零初始状态)
+    
+    转置直接II型的状态递推 z[n] = A·z[n-1] + B·x[n] 是线性的,
+    A为常数矩阵, 因此可以按 1, 2, 4, ... 的步长做log2(N)次整块向量运算:
+    z[n] += A^d · z[n-d], 其中A^d通过反复平方得到
+    """
+    x = np.asarray(signal, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.zeros_like(signal)
+    
+    A = np.array([[-a1, 1.0], [-a2, 0.0]])
+    B = np.array([b1 - a1 * b0, b2 - a2 * b0])
+    
+    # z[n] = 处理完第n个样本后的状态
+    z = x[:, None] * B[None, :]
+    power = A
+    d = 1
+    while d < n:
+        z[d:] = z[d:] + z[:-d] @ power.T
+        power = power @ power
+        d *= 2
+    
+    # y[n] = b0·x[n] + z1[n-1]
+    y = b0 * x
+    y[1:] += z[:-1, 0]
+    return y.astype(signal.dtype, copy=False)
+
+
+@njit(cache=True, fastmath=True)
+def _biquad_cascade(signal, coeffs, state, out):
+    """
+    串联biquad (转置直接II型), 所有频段的系数和状态打包为数组
+    
+    coeffs: (B, 5) 每行为 b0, b1, b2, a1, a2
+    state:  (B, 2) 每行为 z1, z2
+    """
+    num_bands = coeffs.shape[0]
+    for n in range(signal.shape[0]):
+        x = signal[n]
+        for k in range(num_bands):
+            y = coeffs[k, 0] * x + state[k, 0]
+            state[k, 0] = coeffs[k, 1] * x - coeffs[k, 3] * y + state[k, 1]
+            state[k, 1] = coeffs[k, 2] * x - coeffs[k, 4] * y
+            x = y
+        out[n] = x
+    return out
+
+
+# 为固定频段数生成的展开版串联内核 (频段数 -> 编译后的函数)
+_UNROLLED_CASCADES: Dict[int, Any] = {}
+
+# 超过此频段数时不再生成展开内核, 使用通用的 _biquad_cascade
+MAX_UNROLLED_BANDS = 8
+
+
+def _unrolled_cascade(num_bands: int):
+    """
+    生成频段数固定的串联biquad内核
+    
+    与 _biquad_cascade 计算相同, 但频段循环在代码生成时展开,
+    系数和状态在样本循环外读入局部变量, 循环体内没有数组索引和频段分支
+    """
+    kernel = _UNROLLED_CASCADES.get(num_bands)
+    if kernel is not None:
+        return kernel
+    
+    lines = ["def _cascade(signal, coeffs, state, out):"]
+    for k in range(num_bands):
+        lines.append(f"    b0_{k}, b1_{k}, b2_{k}, a1_{k}, a2_{k} = "
+                     f"coeffs[{k}, 0], coeffs[{k}, 1], coeffs[{k}, 2], coeffs[{k}, 3], coeffs[{k}, 4]")
+        lines.append(f"    z1_{k}, z2_{k} = state[{k}, 0], state[{k}, 1]")
+    lines.append("    for n in range(signal.shape[0]):")
+    lines.append("        x = signal[n]")
+    for k in range(num_bands):
+        lines.append(f"        y = b0_{k} * x + z1_{k}")
+        lines.append(f"        z1_{k} = b1_{k} * x - a1_{k} * y + z2_{k}")
+        lines.append(f"        z2_{k} = b2_{k} * x - a2_{k} * y")
+        lines.append("        x = y")
+    lines.append("        out[n] = x")
+    for k in range(num_bands):
+        lines.append(f"    state[{k}, 0], state[{k}, 1] = z1_{k}, z2_{k}")
+    lines.append("    return out")
+    
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), f"<eq_cascade_{num_bands}>", "exec"), namespace)
+    kernel = njit(fastmath=True)(namespace["_cascade"])
+    _UNROLLED_CASCADES[num_bands] = kernel
+    return kernel
+
+
 class EQBand:
     """EQ频段"""
     
@@ -424,15 +520,35 @@ class ParametricEQ:
             result = band.process(result)
         return result
     
+    def get_coefficients(self) -> np.ndarray:
+        """所有频段的biquad系数打包为 (B, 5) 数组: b0, b1, b2, a1, a2"""
+        return np.array(
+            [(band.b0, band.b1, band.b2, band.a1, band.a2) for band in self.bands],
+            dtype=np.float64
+        ).reshape(-1, 5)
+    
     def process_block(self, signal: np.ndarray) -> np.ndarray:
-        """处理信号块"""
-        output = np.zeros_like(signal)
+        """处理信号块 (每块从零状态开始)"""
         # 重置所有频段状态
         for band in self.bands:
             band.reset()
         
-        for i in range(len(signal)):
-            output[i] = self.process(signal[i])
+        coeffs = self.get_coefficients()
+        
+        if HAS_NUMBA:
+            # 编译后的串联内核: 所有频段在同一个样本循环中完成
+            signal = np.asarray(signal)
+            state = np.zeros((len(coeffs), 2))
+            if 0 < len(coeffs) <= MAX_UNROLLED_BANDS:
+                cascade = _unrolled_cascade(len(coeffs))
+            else:
+                cascade = _biquad_cascade
+            return cascade(signal, coeffs, state, np.empty_like(signal))
+        
+        # 纯NumPy: 每个频段对整块做前缀扫描, 频段之间串联
+        output = np.array(signal)
+        for b0, b1, b2, a1, a2 in coeffs:
+            output = _biquad_scan(output, b0, b1, b2, a1, a2)
         
         return output
     
@@ -446,18 +562,17 @@ class ParametricEQ:
         } for band in self.bands]
     
     def set_params(self, params: List[Dict[str, Any]]):
-        """设置所有频段参数"""
+        """设置所有频段参数 (参数多于现有频段时追加新频段)"""
         for i, param in enumerate(params):
-            if i < len(self.bands):
-                band = self.bands[i]
-                if 'band_type' in param:
-                    band.set_band_type(param['band_type'])
-                if 'frequency' in param:
-                    band.set_frequency(param['frequency'])
-                if 'gain_db' in param:
-                    band.set_gain(param['gain_db'])
-                if 'q' in param:
-                    band.set_q(param['q'])
+            band = self.bands[i] if i < len(self.bands) else self.add_band()
+            if 'band_type' in param:
+                band.set_band_type(param['band_type'])
+            if 'frequency' in param:
+                band.set_frequency(param['frequency'])
+            if 'gain_db' in param:
+                band.set_gain(param['gain_db'])
+            if 'q' in param:
+                band.set_q(param['q'])
 
 
 # ============ 高级效果器链 ============
@@ -488,24 +603,53 @@ class AdvancedEffectChain:
             'reverb': False,
             'delay': False
         }
+        
+        # 已启用效果器的处理函数 (在set_*时重建, process时直接顺序调用)
+        self._mono_chain: tuple = ()
+        self._stereo_chain: tuple = ()
+    
+    def _rebuild_chain(self):
+        """按当前启用状态重建处理函数序列"""
+        mono = []
+        stereo = []
+        
+        if self.enabled['compressor']:
+            compress = self.compressor.process
+            mono.append(compress)
+            stereo.append(lambda l, r: (compress(l), compress(r)))
+        
+        if self.enabled['chorus']:
+            mono.append(self.chorus.process_mono)
+            stereo.append(self.chorus.process)
+        
+        if self.enabled['eq']:
+            equalize = self.eq.process_block
+            mono.append(equalize)
+            stereo.append(lambda l, r: (equalize(l), equalize(r)))
+        
+        self._mono_chain = tuple(mono)
+        self._stereo_chain = tuple(stereo)
     
     def set_compressor(self, enabled: bool, **params):
         """配置压缩器"""
         self.enabled['compressor'] = enabled
         if params:
             self.compressor.set_params(params)
+        self._rebuild_chain()
     
     def set_chorus(self, enabled: bool, **params):
         """配置合唱"""
         self.enabled['chorus'] = enabled
         if params:
             self.chorus.set_params(params)
+        self._rebuild_chain()
     
     def set_eq(self, enabled: bool, bands: List[Dict[str, Any]] = None):
         """配置均衡器"""
         self.enabled['eq'] = enabled
         if bands:
             self.eq.set_params(bands)
+        self._rebuild_chain()
     
     def set_reverb(self, enabled: bool, **params):
         """配置混响"""
@@ -529,19 +673,9 @@ class AdvancedEffectChain:
         """处理立体声信号"""
         out_left, out_right = left.copy(), right.copy()
         
-        # 压缩器
-        if self.enabled['compressor']:
-            out_left = self.compressor.process(out_left)
-            out_right = self.compressor.process(out_right)
-        
-        # 合唱
-        if self.enabled['chorus']:
-            out_left, out_right = self.chorus.process(out_left, out_right)
-        
-        # 均衡器
-        if self.enabled['eq']:
-            out_left = self.eq.process_block(out_left)
-            out_right = self.eq.process_block(out_right)
+        # 压缩器 -> 合唱 -> 均衡器 (只包含已启用的)
+        for process in self._stereo_chain:
+            out_left, out_right = process(out_left, out_right)
         
         return out_left, out_right
     
@@ -549,14 +683,8 @@ class AdvancedEffectChain:
         """处理单声道信号"""
         output = signal.copy()
         
-        if self.enabled['compressor']:
-            output = self.compressor.process(output)
-        
-        if self.enabled['chorus']:
-            output = self.chorus.process_mono(output)
-        
-        if self.enabled['eq']:
-            output = self.eq.process_block(output)
+        for process in self._mono_chain:
+            output = process(output)
         
         return output
     
@@ -584,3 +712,4 @@ class AdvancedEffectChain:
         self.eq = ParametricEQ(self.sample_rate)
         for key in self.enabled:
             self.enabled[key] = False
+        self._rebuild_chain()
@@ -7,10 +7,20 @@ import numpy as np
 import os
 from pathlib import Path
 from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 import json
 
+try:
+    import soundfile as sf
+    HAS_SOUNDFILE = True
+except (ImportError, OSError):
+    # OSError: 已安装soundfile但找不到libsndfile
+    HAS_SOUNDFILE = False
+
+# 位深度 -> libsndfile PCM子类型
+SOUNDFILE_SUBTYPES = {16: 'PCM_16', 24: 'PCM_24', 32: 'PCM_32'}
+
 
 class AudioFormat(Enum):
     """支持的音频格式"""
@@ -103,11 +113,11 @@ class AudioExporter:
         """应用导出设置"""
         processed = audio_data.copy()
         
-        # 归一化
+        # 归一化: 一次求峰值, 倒数乘法就地缩放
         if settings.normalize:
-            max_val = np.max(np.abs(processed))
-            if max_val > 0:
-                processed = processed / max_val * 0.95  # 留出3dB余量
+            peak = np.max(np.abs(processed))
+            if peak > 0:
+                np.multiply(processed, 0.95 / peak, out=processed)  # 留出3dB余量
         
         # 转换为指定声道数
         if settings.channels == 2 and len(processed.shape) == 1:
@@ -115,45 +125,64 @@ class AudioExporter:
             processed = np.column_stack([processed, processed])
         elif settings.channels == 1 and len(processed.shape) == 2:
             # 立体声转单声道
-            processed = np.mean(processed, axis=1)
+            processed = np.mean(processed, axis=1, dtype=np.float32)
         
-        # 淡入淡出
+        # 淡入淡出 (float32斜坡, 就地相乘)
         if settings.fade_in_ms > 0:
-            fade_samples = int(settings.fade_in_ms * settings.sample_rate / 1000)
-            fade_in = np.linspace(0, 1, fade_samples)
-            # 确保fade_in可以广播到所有通道
-            fade_in = fade_in.reshape(-1, 1) if len(processed.shape) > 1 else fade_in
-            processed[:fade_samples] *= fade_in
+            fade_samples = min(int(settings.fade_in_ms * settings.sample_rate / 1000), len(processed))
+            if fade_samples > 0:
+                fade_in = np.linspace(0, 1, fade_samples, dtype=np.float32)
+                # 确保fade_in可以广播到所有通道
+                fade_in = fade_in.reshape(-1, 1) if len(processed.shape) > 1 else fade_in
+                processed[:fade_samples] *= fade_in
         
         if settings.fade_out_ms > 0:
-            fade_samples = int(settings.fade_out_ms * settings.sample_rate / 1000)
-            fade_out = np.linspace(1, 0, fade_samples)
-            # 确保fade_out可以广播到所有通道
-            fade_out = fade_out.reshape(-1, 1) if len(processed.shape) > 1 else fade_out
-            processed[-fade_samples:] *= fade_out
+            fade_samples = min(int(settings.fade_out_ms * settings.sample_rate / 1000), len(processed))
+            if fade_samples > 0:
+                fade_out = np.linspace(1, 0, fade_samples, dtype=np.float32)
+                # 确保fade_out可以广播到所有通道
+                fade_out = fade_out.reshape(-1, 1) if len(processed.shape) > 1 else fade_out
+                processed[-fade_samples:] *= fade_out
         
         return processed
     
+    @staticmethod
+    def _to_int16(audio_data: np.ndarray) -> np.ndarray:
+        """float32 -> int16 PCM
+        
+        audio_data 是 _apply_settings 生成的私有副本, 直接就地缩放,
+        只在转换整型时分配一次输出数组。
+        """
+        if audio_data.dtype == np.float32:
+            scaled = np.multiply(audio_data, 32767, out=audio_data)
+        else:
+            scaled = np.multiply(audio_data, 32767, dtype=np.float32)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        return scaled.astype(np.int16, copy=False)
+    
     def _export_wav(
         self,
         audio_data: np.ndarray,
         filepath: str,
         settings: ExportSettings
     ) -> Dict[str, Any]:
-        """导出WAV文件"""
+        """导出WAV文件 (优先使用libsndfile, 其次scipy, 最后标准库wave)"""
+        if HAS_SOUNDFILE:
+            return self._export_soundfile(audio_data, filepath, settings, AudioFormat.WAV)
+        
         try:
             from scipy.io import wavfile
             
             # 根据位深度转换数据类型
             if settings.bits_per_sample == 16:
-                audio_int = (audio_data * 32767).astype(np.int16)
+                audio_int = self._to_int16(audio_data)
             elif settings.bits_per_sample == 24:
                 # 24位需要特殊处理
                 audio_int = (audio_data * 8388607).astype(np.int32)
             elif settings.bits_per_sample == 32:
                 audio_int = (audio_data * 2147483647).astype(np.int32)
             else:
-                audio_int = (audio_data * 32767).astype(np.int16)
+                audio_int = self._to_int16(audio_data)
             
             # 写入WAV文件
             wavfile.write(
@@ -189,15 +218,13 @@ class AudioExporter:
     ) -> Dict[str, Any]:
         """使用标准库导出WAV"""
         import wave
-        import struct
         
-        # 转换为16位整数
-        audio_int = (audio_data * 32767).astype(np.int16)
+        # 转换为16位小端整数 (立体声(N, 2)数组按行存储即为交错格式)
+        audio_int = np.ascontiguousarray(self._to_int16(audio_data), dtype='<i2')
         
         # 获取文件大小
-        num_samples = len(audio_int.flatten())
-        byte_rate = settings.sample_rate * settings.channels * 2  # 16 bits = 2 bytes
-        data_size = num_samples * settings.channels * 2
+        num_samples = audio_int.size
+        data_size = audio_int.nbytes
         file_size = 36 + data_size  # RIFF header size + data size
         
         # 写入WAV
@@ -206,11 +233,8 @@ class AudioExporter:
             wav_file.setsampwidth(2)  # 2 bytes = 16 bits
             wav_file.setframerate(settings.sample_rate)
             
-            # 转换为字节
-            audio_bytes = b''.join(
-                struct.pack('<h', sample) for sample in audio_int.flatten()
-            )
-            wav_file.writeframes(audio_bytes)
+            # 整块写入
+            wav_file.writeframes(audio_int.tobytes())
         
         duration = num_samples / (settings.sample_rate * settings.channels)
         
@@ -233,47 +257,54 @@ class AudioExporter:
         settings: ExportSettings
     ) -> Dict[str, Any]:
         """导出FLAC文件"""
+        if not HAS_SOUNDFILE:
+            return {
+                "success": False,
+                "error": "需要安装 soundfile: pip install soundfile",
+                "suggestion": "或者使用WAV格式导出"
+            }
+        
+        # FLAC最高支持24位
+        if settings.bits_per_sample not in (16, 24):
+            settings = replace(settings, bits_per_sample=16)
+        
+        return self._export_soundfile(audio_data, filepath, settings, AudioFormat.FLAC)
+    
+    def _export_soundfile(
+        self,
+        audio_data: np.ndarray,
+        filepath: str,
+        settings: ExportSettings,
+        format_type: AudioFormat
+    ) -> Dict[str, Any]:
+        """通过libsndfile导出 (float32直接写入, 整型转换在C层完成)"""
+        bits = settings.bits_per_sample if settings.bits_per_sample in SOUNDFILE_SUBTYPES else 16
+        
         try:
-            import soundfile as sf
-            
-            # FLAC支持多种格式
-            if settings.bits_per_sample == 24:
-                subtype = 'PCM_24'
-            elif settings.bits_per_sample == 16:
-                subtype = 'PCM_16'
-            else:
-                subtype = 'PCM_16'
-            
             sf.write(
                 filepath,
                 audio_data,
                 settings.sample_rate,
-                subtype=subtype
+                subtype=SOUNDFILE_SUBTYPES[bits],
+                format=format_type.name
             )
-            
-            file_size = os.path.getsize(filepath)
-            duration = len(audio_data) / settings.sample_rate
-            
-            return {
-                "success": True,
-                "format": "FLAC",
-                "filepath": filepath,
-                "file_size_bytes": file_size,
-                "duration_seconds": duration,
-                "sample_rate": settings.sample_rate,
-                "channels": settings.channels,
-                "bits_per_sample": settings.bits_per_sample,
-                "message": f"✅ FLAC导出成功: {filepath}"
-            }
-            
-        except ImportError:
-            return {
-                "success": False,
-                "error": "需要安装 soundfile: pip install soundfile",
-                "suggestion": "或者使用WAV格式导出"
-            }
         except Exception as e:
             return {"success": False, "error": str(e)}
+        
+        file_size = os.path.getsize(filepath)
+        duration = len(audio_data) / settings.sample_rate
+        
+        return {
+            "success": True,
+            "format": format_type.name,
+            "filepath": filepath,
+            "file_size_bytes": file_size,
+            "duration_seconds": duration,
+            "sample_rate": settings.sample_rate,
+            "channels": settings.channels,
+            "bits_per_sample": bits,
+            "message": f"✅ {format_type.name}导出成功: {filepath}"
+        }
     
     def export_performance(
         self,
@@ -364,40 +395,46 @@ class SynthAudioExporter:
         # 生成音频
         num_samples = int(duration_seconds * self.sample_rate)
         audio_data = np.zeros(num_samples, dtype=np.float32)
+        if num_samples == 0 or not notes:
+            return audio_data
         
-        # 跟踪当前活动的音符
-        active_note = None
+        # 每个样本上的活动音符 (同一时刻以列表中靠前的音符为准, -1 表示无)
+        t = np.arange(num_samples) / self.sample_rate
+        active = np.full(num_samples, -1, dtype=np.int64)
+        for idx in range(len(notes) - 1, -1, -1):
+            freq, start, dur, vel = notes[idx]
+            active[(t >= start) & (t < start + dur)] = idx
         
-        for i in range(num_samples):
-            current_time = i / self.sample_rate
-            
-            # 检查当前时间点应该播放哪个音符
-            new_active = None
-            for freq, start, dur, vel in notes:
-                if start <= current_time < start + dur:
-                    new_active = (freq, vel)
-                    break
-            
-            # 如果音符改变
-            if new_active != active_note:
-                if new_active is None:
-                    # 释放当前音符
+        # (频率, 力度) 相同的音符视为同一音符, 相邻时不重新触发
+        canonical = {}
+        canon_index = np.array(
+            [canonical.setdefault((freq, vel), idx) for idx, (freq, _, _, vel) in enumerate(notes)]
+            + [-1]
+        )
+        active = canon_index[active]
+        
+        # 按活动音符切分成段, 每段整块生成
+        bounds = np.flatnonzero(np.diff(active)) + 1
+        seg_starts = np.concatenate(([0], bounds))
+        seg_ends = np.concatenate((bounds, [num_samples]))
+        
+        for seg_start, seg_end in zip(seg_starts, seg_ends):
+            idx = active[seg_start]
+            if idx < 0:
+                # 从音符进入静音时释放当前音符 (开头的静音段没有可释放的音符; 静音段不推进包络)
+                if seg_start > 0:
                     envelope.release_envelope()
-                else:
-                    # 触发新音符
-                    oscillator.set_frequency(new_active[0])
-                    envelope.trigger()
-                active_note = new_active
+                continue
             
-            # 生成样本
-            if active_note:
-                freq, vel = active_note
-                oscillator.set_frequency(freq)
-                sample = oscillator.process_sample()
-                env = envelope.process(1)[0]  # 处理1个样本
-                audio_data[i] = sample * env * (vel / 127.0)
-            else:
-                audio_data[i] = 0.0
+            # 触发新音符
+            freq, _, _, vel = notes[idx]
+            length = seg_end - seg_start
+            oscillator.set_frequency(freq)
+            envelope.trigger()
+            
+            wave = oscillator.generate_from_freq(np.full(length, freq))
+            env = envelope.process(length)
+            audio_data[seg_start:seg_end] = wave * env * (vel / 127.0)
         
         return audio_data
     
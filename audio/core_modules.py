@@ -3,6 +3,29 @@
 
 import numpy as np
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """numba未安装时的空装饰器 - 直接返回原函数（纯Python执行）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 噪声源 (PCG64, 整块生成)
+_rng = np.random.default_rng()
+
+
+def _white_noise(num_samples):
+    """生成 [-1, 1) 均匀白噪声块 (float32)"""
+    noise = _rng.random(num_samples, dtype=np.float32)
+    noise *= 2.0
+    noise -= 1.0
+    return noise
+
 # ============ 振荡器模块 ============
 
 class Oscillator:
@@ -21,28 +44,77 @@ class Oscillator:
         self.phase_increment = 2 * np.pi * freq / self.sample_rate
     
     def set_wave_type(self, wave_type):
-        """设置波形类型: sine, square, sawtooth, triangle"""
+        """设置波形类型: sine, square, sawtooth, triangle, noise"""
         self.wave_type = wave_type
     
-    def generate(self, duration=1.0):
-        """生成音频样本"""
+    def generate(self, duration=1.0, out=None):
+        """生成音频样本
+        
+        传入out (长度为duration对应的样本数) 时结果直接写入out并返回out,
+        用于每帧重复生成时复用同一块缓冲区
+        """
         num_samples = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, num_samples, False)
         
-        if self.wave_type == 'sine':
-            return np.sin(2 * np.pi * self.frequency * t)
+        if self.wave_type == 'noise':
+            if out is None:
+                return _white_noise(num_samples)
+            out[:] = _white_noise(num_samples)
+            return out
         
-        elif self.wave_type == 'square':
-            return np.where(np.sin(2 * np.pi * self.frequency * t) >= 0, 1.0, -1.0)
+        if out is None:
+            out = np.empty(num_samples)
         
-        elif self.wave_type == 'sawtooth':
-            return 2 * (self.frequency * t % 1) - 1
+        t = np.linspace(0, duration, num_samples, False)
+        
+        if self.wave_type == 'sawtooth':
+            np.multiply(t, self.frequency, out=out)
+            np.mod(out, 1, out=out)
+            out *= 2
+            out -= 1
         
         elif self.wave_type == 'triangle':
-            return 2 * np.abs(2 * (self.frequency * t % 1)) - 1
+            np.multiply(t, self.frequency, out=out)
+            np.mod(out, 1, out=out)
+            out *= 2
+            np.abs(out, out=out)
+            out *= 2
+            out -= 1
         
         else:
-            return np.sin(2 * np.pi * self.frequency * t)
+            # sine / square (未知类型按正弦处理)
+            np.multiply(t, 2 * np.pi * self.frequency, out=out)
+            np.sin(out, out=out)
+            if self.wave_type == 'square':
+                np.copysign(1.0, out, out=out)
+        
+        return out
+    
+    def generate_from_freq(self, freq):
+        """按逐样本频率数组批量生成音频（用于调制，等价于逐个调用process_sample）"""
+        freq = np.asarray(freq, dtype=np.float64)
+        increments = 2 * np.pi * freq / self.sample_rate
+        
+        # 相位累加: 第i个样本使用前i个增量之和
+        phase = np.empty_like(increments)
+        if len(phase) == 0:
+            return phase
+        phase[0] = 0.0
+        np.cumsum(increments[:-1], out=phase[1:])
+        phase += self.phase
+        np.mod(phase, 2 * np.pi, out=phase)
+        self.phase = (phase[-1] + increments[-1]) % (2 * np.pi)
+        
+        if self.wave_type == 'sine':
+            return np.sin(phase)
+        elif self.wave_type == 'square':
+            return np.where(np.sin(phase) >= 0, 1.0, -1.0)
+        elif self.wave_type == 'sawtooth':
+            return 2 * (phase / (2 * np.pi)) - 1
+        elif self.wave_type == 'triangle':
+            return 2 * np.abs(phase / np.pi - 0.5) - 1
+        elif self.wave_type == 'noise':
+            return _white_noise(len(phase))
+        return np.zeros_like(phase)
     
     def process_sample(self):
         """处理单个样本（用于实时播放）"""
@@ -56,6 +128,8 @@ class Oscillator:
             sample = 2 * (self.phase / (2 * np.pi)) - 1
         elif self.wave_type == 'triangle':
             sample = 2 * np.abs(self.phase / np.pi - 0.5) - 1
+        elif self.wave_type == 'noise':
+            sample = _rng.random() * 2 - 1
         
         self.phase += self.phase_increment
         if self.phase >= 2 * np.pi:
@@ -105,6 +179,22 @@ class MultiOscillator:
 
 # ============ 滤波器模块 ============
 
+@njit(cache=True)
+def _biquad_block(audio_data, out, b0, b1, b2, a1, a2):
+    """对整块音频应用biquad差分方程 (numba可用时编译为原生循环)"""
+    x1, x2 = 0.0, 0.0
+    y1, y2 = 0.0, 0.0
+    
+    for n in range(len(audio_data)):
+        x = audio_data[n]
+        y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+        out[n] = y
+        x2, x1 = x1, x
+        y2, y1 = y1, y
+    
+    return out
+
+
 class Filter:
     """滤波器 - 修改音色"""
     
@@ -122,8 +212,8 @@ class Filter:
         """设置滤波器类型: lowpass, highpass, bandpass"""
         self.filter_type = filter_type
     
-    def process(self, audio_data):
-        """处理音频数据"""
+    def process(self, audio_data, out=None):
+        """处理音频数据 (传入out时结果写入out, 避免每次分配输出数组)"""
         # 简单的IIR滤波器实现
         # 实际项目中应该用更复杂的算法
         
@@ -156,19 +246,10 @@ class Filter:
             a1 = -2 * cos_omega / a0
             a2 = (1 - alpha) / a0
         
-        # 应用滤波器
-        filtered = np.zeros_like(audio_data)
-        x1, x2 = 0, 0
-        y1, y2 = 0, 0
-        
-        for n in range(len(audio_data)):
-            x = audio_data[n]
-            y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
-            filtered[n] = y
-            x2, x1 = x1, x
-            y2, y1 = y1, y
-        
-        return filtered
+        # 应用滤波器 (整块处理)
+        audio_data = np.asarray(audio_data)
+        filtered = np.zeros_like(audio_data) if out is None else out
+        return _biquad_block(audio_data, filtered, b0, b1, b2, a1, a2)
 
 
 # ============ 包络模块 ============
@@ -5,9 +5,11 @@
 
 import math
 import numpy as np
-from typing import Optional, List, Tuple
+from typing import Optional, Tuple
 from dataclasses import dataclass
 
+from .core_modules import njit, HAS_NUMBA
+
 
 @dataclass
 class PhaserParams:
@@ -40,6 +42,61 @@ class WavefolderParams:
     mix: float = 0.5  # 干湿比 (0-1)
 
 
+@njit(cache=True, fastmath=True)
+def _fused_effects(samples, out, delay_lines, delay_index, stages,
+                   delay_samples, alpha, feedback, phaser_mix,
+                   carrier_prev, carrier, carrier_coeff, ring_mix, step, crush_mix,
+                   use_phaser, use_ring, use_crush):
+    """
+    融合效果内核: 相位器 → 环形调制 → 比特粉碎 在同一个循环中完成
+    
+    每个样本只读写一次, 避免多次遍历缓冲区和中间临时数组
+    环形调制载波用二阶递推 sin[n+1] = 2cos(ω)·sin[n] − sin[n−1] 逐样本生成
+    返回更新后的相位器延迟线索引
+    """
+    line_len = delay_lines.shape[1]
+    
+    for i in range(samples.shape[0]):
+        x = samples[i]
+        
+        if use_phaser:
+            sample = x
+            for stage in range(stages):
+                # 写入延迟线, 读取延迟样本
+                delay_lines[stage, delay_index] = sample
+                read_index = (delay_index - delay_samples + line_len) % line_len
+                delayed = delay_lines[stage, read_index]
+                
+                # Allpass滤波
+                sample = delayed + alpha * (sample - delayed)
+                
+                # 反馈
+                if stage == stages - 1:
+                    sample = sample * feedback + delayed * (1 - feedback)
+            
+            delay_index = (delay_index + 1) % line_len
+            x = x * (1 - phaser_mix) + sample * phaser_mix
+        
+        if use_ring:
+            x = x * (1 - ring_mix) + x * carrier * ring_mix * 2
+            carrier_next = carrier_coeff * carrier - carrier_prev
+            carrier_prev = carrier
+            carrier = carrier_next
+        
+        if use_crush:
+            crushed = round(x / step) * step
+            crushed = min(1.0, max(-1.0, crushed))
+            x = x * (1 - crush_mix) + crushed * crush_mix
+        
+        out[i] = x
+    
+    return delay_index
+
+
+# 不使用相位器时传给融合内核的占位延迟线
+_NO_DELAY_LINES = np.zeros((1, 1))
+
+
 class Phaser:
     """相位器效果器"""
     
@@ -51,9 +108,7 @@ class Phaser:
     def reset(self):
         """重置状态"""
         self.lfo_phase = 0.0
-        self.delay_lines: List[List[float]] = []
-        for _ in range(self.params.stages):
-            self.delay_lines.append([0.0] * 1024)
+        self.delay_lines = np.zeros((self.params.stages, 1024))
         self.delay_index = 0
     
     def set_params(self, **kwargs):
@@ -62,11 +117,8 @@ class Phaser:
             if hasattr(self.params, key):
                 setattr(self.params, key, value)
     
-    def process(self, samples: np.ndarray) -> np.ndarray:
-        """处理音频"""
-        if len(samples) == 0:
-            return samples
-        
+    def _block_params(self) -> Tuple[int, float]:
+        """推进LFO并计算本块的延迟样本数和allpass系数"""
         # 更新LFO
         lfo_freq = self.params.rate / self.sample_rate
         self.lfo_phase = (self.lfo_phase + lfo_freq) % 1.0
@@ -81,36 +133,23 @@ class Phaser:
         delay_samples = self.sample_rate / (2 * math.pi * current_freq)
         delay_samples = max(1, min(100, int(delay_samples)))
         
-        output = np.zeros_like(samples)
-        
-        for i in range(len(samples)):
-            sample = samples[i]
-            
-            # 多级相位处理
-            for stage in range(self.params.stages):
-                delay_line = self.delay_lines[stage]
-                
-                # 写入延迟线
-                delay_line[self.delay_index] = sample
-                
-                # 读取延迟样本
-                read_index = (self.delay_index - delay_samples + len(delay_line)) % len(delay_line)
-                delayed = delay_line[read_index]
-                
-                # Allpass滤波
-                alpha = (1 - current_freq / (self.sample_rate / 2)) / (1 + current_freq / (self.sample_rate / 2))
-                sample = delayed + alpha * (sample - delayed)
-                
-                # 反馈
-                if stage == self.params.stages - 1:
-                    sample = sample * self.params.feedback + delayed * (1 - self.params.feedback)
-            
-            # 更新索引
-            self.delay_index = (self.delay_index + 1) % len(self.delay_lines[0])
-            
-            # 混合
-            output[i] = samples[i] * (1 - self.params.mix) + sample * self.params.mix
+        alpha = (1 - current_freq / (self.sample_rate / 2)) / (1 + current_freq / (self.sample_rate / 2))
+        return delay_samples, alpha
+    
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """处理音频"""
+        if len(samples) == 0:
+            return samples
         
+        delay_samples, alpha = self._block_params()
+        output = np.zeros_like(samples)
+        self.delay_index = _fused_effects(
+            samples, output, self.delay_lines, self.delay_index,
+            min(self.params.stages, len(self.delay_lines)),
+            delay_samples, alpha, self.params.feedback, self.params.mix,
+            0.0, 0.0, 0.0, 0.0, 1.0, 0.0,
+            True, False, False
+        )
         return output
 
 
@@ -133,24 +172,39 @@ class RingModulator:
             if hasattr(self.params, key):
                 setattr(self.params, key, value)
     
+    def _advance_phase(self, num_samples: int) -> Tuple[float, float]:
+        """返回本块的起始相位和每样本相位增量, 并把载波相位推进到块末"""
+        omega = 2 * math.pi * self.params.frequency / self.sample_rate
+        phase = self.carrier_phase
+        self.carrier_phase = (phase + omega * num_samples) % (2 * math.pi)
+        return phase, omega
+    
+    def _block_carrier(self, num_samples: int) -> Tuple[float, float, float]:
+        """返回本块载波递推的初值 (sin[-1], sin[0], 2cos(ω)), 并把载波相位推进到块末
+        
+        每块都从累计相位重新取初值, 递推的舍入误差不会跨块累积
+        """
+        phase, omega = self._advance_phase(num_samples)
+        return math.sin(phase - omega), math.sin(phase), 2 * math.cos(omega)
+    
     def process(self, samples: np.ndarray) -> np.ndarray:
         """处理音频"""
         if len(samples) == 0:
             return samples
         
-        # 更新载波相位
-        carrier_freq = self.params.frequency / self.sample_rate
-        self.carrier_phase = (self.carrier_phase + carrier_freq) % (2 * math.pi)
-        
-        # 生成载波
-        carrier = np.sin(self.carrier_phase)
-        
-        # 环形调制
-        modulated = samples * carrier
-        
-        # 混合
-        output = samples * (1 - self.params.mix) + modulated * self.params.mix * 2
-        
+        if not HAS_NUMBA:
+            # 没有numba时融合内核是逐样本的Python循环, 改用向量化计算
+            phase, omega = self._advance_phase(len(samples))
+            carrier = np.sin(phase + omega * np.arange(len(samples)))
+            return samples * (1 - self.params.mix) + samples * carrier * self.params.mix * 2
+        
+        carrier_prev, carrier, carrier_coeff = self._block_carrier(len(samples))
+        output = np.empty_like(samples)
+        _fused_effects(
+            samples, output, _NO_DELAY_LINES, 0, 0, 1, 0.0, 0.0, 0.0,
+            carrier_prev, carrier, carrier_coeff, self.params.mix, 1.0, 0.0,
+            False, True, False
+        )
         return output
 
 
@@ -172,16 +226,18 @@ class Bitcrusher:
             if hasattr(self.params, key):
                 setattr(self.params, key, value)
     
+    def _step(self) -> float:
+        """量化步长"""
+        if self.params.bits >= 16:
+            return 1.0
+        return 2.0 / (2 ** self.params.bits)
+    
     def process(self, samples: np.ndarray) -> np.ndarray:
         """处理音频"""
         if len(samples) == 0:
             return samples
         
-        # 量化步长
-        if self.params.bits >= 16:
-            step = 1.0
-        else:
-            step = 2.0 / (2 ** self.params.bits)
+        step = self._step()
         
         # 量化
         crushed = np.round(samples / step) * step
@@ -339,15 +395,20 @@ class EnhancedEffectChain:
         """处理音频"""
         output = samples.copy()
         
-        # 依次应用效果
-        if self.enabled.get('phaser', False):
-            output = self.phaser.process(output)
-        
-        if self.enabled.get('ring_mod', False):
-            output = self.ring_mod.process(output)
-        
-        if self.enabled.get('bitcrusher', False):
-            output = self.bitcrusher.process(output)
+        # 相位器 → 环形调制 → 比特粉碎: 一次遍历完成
+        use_phaser = self.enabled.get('phaser', False)
+        use_ring = self.enabled.get('ring_mod', False)
+        use_crush = self.enabled.get('bitcrusher', False)
+        if not HAS_NUMBA:
+            # 没有numba时融合内核退化为逐样本的Python循环, 环形调制和比特粉碎保持各自的向量化实现
+            if use_phaser:
+                output = self.phaser.process(output)
+            if use_ring:
+                output = self.ring_mod.process(output)
+            if use_crush:
+                output = self.bitcrusher.process(output)
+        elif len(output) > 0 and (use_phaser or use_ring or use_crush):
+            output = self._process_fused(output, use_phaser, use_ring, use_crush)
         
         if self.enabled.get('wavefolder', False):
             output = self.wavefolder.process(output)
@@ -359,6 +420,27 @@ class EnhancedEffectChain:
         
         return output
     
+    def _process_fused(self, samples: np.ndarray, use_phaser: bool,
+                       use_ring: bool, use_crush: bool) -> np.ndarray:
+        """用融合内核处理相位器/环形调制/比特粉碎 (结果与依次调用各自的process一致)"""
+        phaser = self.phaser
+        delay_samples, alpha = phaser._block_params() if use_phaser else (1, 0.0)
+        if use_ring:
+            carrier_prev, carrier, carrier_coeff = self.ring_mod._block_carrier(len(samples))
+        else:
+            carrier_prev, carrier, carrier_coeff = 0.0, 0.0, 0.0
+        
+        output = np.empty_like(samples)
+        phaser.delay_index = _fused_effects(
+            samples, output, phaser.delay_lines, phaser.delay_index,
+            min(phaser.params.stages, len(phaser.delay_lines)),
+            delay_samples, alpha, phaser.params.feedback, phaser.params.mix,
+            carrier_prev, carrier, carrier_coeff, self.ring_mod.params.mix,
+            self.bitcrusher._step(), self.bitcrusher.params.mix,
+            use_phaser, use_ring, use_crush
+        )
+        return output
+    
     def get_effect_params(self, effect_name: str):
         """获取效果器参数"""
         if effect_name == 'phaser':
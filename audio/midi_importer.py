@@ -9,6 +9,14 @@ from collections import defaultdict
 # ============ 音符转换 ============
 NOTES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 NUM_TO_NOTE = {i: note for i, note in enumerate(NOTES)}
+NOTE_TO_NUM = {note: i for i, note in enumerate(NOTES)}
+
+# 预计算的音符名称 → MIDI编号表 (C0 ~ B9)
+NOTE_NAME_TO_MIDI = {
+    f"{note}{octave}": num + (octave + 1) * 12
+    for octave in range(10)
+    for note, num in NOTE_TO_NUM.items()
+}
 
 
 def midi_note_to_name(midi_note):
@@ -19,10 +27,14 @@ def midi_note_to_name(midi_note):
 
 
 def note_name_to_midi(note_name):
-    """将音符名称转换为MIDI编号"""
+    """将音符名称转换为MIDI编号 (已经是MIDI编号的整数直接返回)"""
+    if isinstance(note_name, int):
+        return note_name
+    midi_note = NOTE_NAME_TO_MIDI.get(note_name)
+    if midi_note is not None:
+        return midi_note
     note = note_name[:-1]
     octave = int(note_name[-1])
-    NOTE_TO_NUM = {note: i for i, note in enumerate(NOTES)}
     return NOTE_TO_NUM[note] + (octave + 1) * 12
 
 
@@ -248,6 +260,7 @@ class MIDIExporter:
         
         Args:
             melody: 旋律列表 [{'note': 'C4', 'duration': 1.0, 'velocity': 80}]
+                    'note' 可以是音符名称 ('C4') 或 MIDI编号 (60)
             filename: 输出文件名
             tempo: 节拍速度 (BPM)
         """
@@ -5,7 +5,7 @@ MIDI Input Handler - 实时MIDI键盘输入支持
 import mido
 import threading
 import time
-from typing import Callable, Optional, List
+from typing import Callable, Optional, List, Dict
 from enum import Enum
 
 
@@ -24,9 +24,11 @@ class MIDIInputHandler:
         self.port: Optional[mido.PortIO] = None
         self.running = False
         self.thread: Optional[threading.Thread] = None
-        self callbacks: List[Callable] = []
+        self.callbacks: List[Callable] = []
         self.current_note = None
         self.notes_pressed: set = set()
+        # 按下顺序 (有序dict, 最后一个键即最近按下且仍按住的音符)
+        self._press_order: Dict[int, None] = {}
         
     def get_input_ports(self) -> List[str]:
         """获取可用的MIDI输入端口"""
@@ -83,6 +85,8 @@ class MIDIInputHandler:
             if msg.velocity > 0:
                 # 按下音符
                 self.notes_pressed.add(msg.note)
+                self._press_order.pop(msg.note, None)
+                self._press_order[msg.note] = None
                 self.current_note = msg.note
                 self._notify_callbacks({
                     'type': 'note_on',
@@ -93,6 +97,7 @@ class MIDIInputHandler:
             else:
                 # 释放音符 (note_on with velocity 0 = note_off)
                 self.notes_pressed.discard(msg.note)
+                self._press_order.pop(msg.note, None)
                 if msg.note == self.current_note:
                     self.current_note = None
                 self._notify_callbacks({
@@ -104,6 +109,7 @@ class MIDIInputHandler:
         
         elif msg.type == 'note_off':
             self.notes_pressed.discard(msg.note)
+            self._press_order.pop(msg.note, None)
             if msg.note == self.current_note:
                 self.current_note = None
             self._notify_callbacks({
@@ -152,6 +158,11 @@ class MIDIInputHandler:
         """获取当前按下的音符"""
         return self.notes_pressed.copy()
     
+    @property
+    def last_pressed(self) -> Optional[int]:
+        """最近按下且仍按住的音符 (松开后回退到之前按住的音符)"""
+        return next(reversed(self._press_order), None)
+    
     def get_current_note(self) -> Optional[int]:
         """获取当前按下的音符(单音模式)"""
         return self.current_note
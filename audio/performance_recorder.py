@@ -10,6 +10,16 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
+# 事件类型 (MIDI状态字节高4位)
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+
+# 回调批量派发频率 (Hz)
+CALLBACK_FLUSH_HZ = 60
+
+# 待派发回调队列上限 (超出时丢弃最旧的回调, 录音事件本身不受影响)
+CALLBACK_QUEUE_SIZE = 4096
+
 
 class RecordingState(Enum):
     """录音状态"""
@@ -53,15 +63,23 @@ class PerformanceRecorder:
         self.note_start_times: Dict[int, float] = {}  # 音符 -> 开始时间
         self.active_notes: Dict[int, int] = {}  # 音符 -> 力度
         
+        # 已结束音符的日志: (开始时间, 结束时间, 音符, 力度, 通道), 停止录音时统一生成NoteEvent
+        self._events: deque = deque()
+        self._recording_start_ns: int = 0
+        
         # 回放状态
         self.playback_track: Optional[PerformanceTrack] = None
         self.playback_index: int = 0
         self.playback_start_time: float = 0
         self.pause_time: float = 0
         
-        # 回调函数
+        # 回调函数 (由后台线程按 CALLBACK_FLUSH_HZ 批量派发)
         self.on_note_on: Optional[callable] = None
         self.on_note_off: Optional[callable] = None
+        # 待派发回调: (类型, 音符, 力度, 通道)
+        self._callback_queue: deque = deque(maxlen=CALLBACK_QUEUE_SIZE)
+        self._flush_stop = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
         
         # 线程锁
         self.lock = threading.Lock()
@@ -74,9 +92,13 @@ class PerformanceRecorder:
             
             self.current_track = PerformanceTrack(name=name)
             self.recording_start_time = time.time()
+            self._recording_start_ns = time.monotonic_ns()
+            self._events.clear()
+            self._callback_queue.clear()
             self.note_start_times = {}
             self.active_notes = {}
             self.state = RecordingState.RECORDING
+            self._start_flush_thread()
             
             print(f"🎙️ 开始录音: {name}")
             return self.current_track
@@ -87,8 +109,16 @@ class PerformanceRecorder:
             if self.state != RecordingState.RECORDING:
                 return None
             
+            self.state = RecordingState.IDLE
+            current_time = self._elapsed()
+        
+        # 派发完剩余回调 (派发线程需要获取锁, 所以在锁外等待它退出)
+        self._stop_flush_thread()
+        
+        with self.lock:
+            self._build_events()
+            
             # 完成所有未关闭的音符
-            current_time = time.time() - self.recording_start_time
             for note, start_time in self.note_start_times.items():
                 if note in self.active_notes:
                     duration = current_time - start_time
@@ -103,48 +133,82 @@ class PerformanceRecorder:
             track = self.current_track
             self.recorded_tracks.append(track)
             self.current_track = None
-            self.state = RecordingState.IDLE
             
             print(f"🎙️ 录音完成: {track.name} ({len(track.events)} 个音符)")
             return track
     
+    def _elapsed(self) -> float:
+        """录音开始后经过的时间 (秒)"""
+        return (time.monotonic_ns() - self._recording_start_ns) / 1e9
+    
+    def _build_events(self):
+        """把已结束音符的日志一次性转换成音符事件"""
+        events = self.current_track.events
+        while self._events:
+            start_time, end_time, note, velocity, channel = self._events.popleft()
+            events.append(NoteEvent(
+                note=note,
+                velocity=velocity,
+                start_time=start_time,
+                duration=end_time - start_time,
+                channel=channel
+            ))
+    
     def record_note_on(self, note: int, velocity: int, channel: int = 0):
-        """记录音符按下"""
+        """记录音符按下 (回调排队, 由派发线程在锁外调用)"""
         with self.lock:
             if self.state == RecordingState.RECORDING:
-                current_time = time.time() - self.recording_start_time
-                self.note_start_times[note] = current_time
+                self.note_start_times[note] = self._elapsed()
                 self.active_notes[note] = velocity
-                
-                # 回调
                 if self.on_note_on:
-                    self.on_note_on(note, velocity, channel)
+                    self._callback_queue.append((NOTE_ON, note, velocity, channel))
     
     def record_note_off(self, note: int, channel: int = 0):
-        """记录音符释放"""
+        """记录音符释放 (只记录已按下的音符; NoteEvent在停止录音时才生成)"""
         with self.lock:
-            if self.state == RecordingState.RECORDING:
-                if note in self.note_start_times:
-                    current_time = time.time() - self.recording_start_time
-                    start_time = self.note_start_times[note]
-                    duration = current_time - start_time
-                    velocity = self.active_notes.get(note, 100)
-                    
-                    event = NoteEvent(
-                        note=note,
-                        velocity=velocity,
-                        start_time=start_time,
-                        duration=duration,
-                        channel=channel
-                    )
-                    self.current_track.events.append(event)
-                    
-                    del self.note_start_times[note]
-                    del self.active_notes[note]
-                    
-                    # 回调
-                    if self.on_note_off:
-                        self.on_note_off(note, channel)
+            if self.state == RecordingState.RECORDING and note in self.note_start_times:
+                start_time = self.note_start_times.pop(note)
+                velocity = self.active_notes.pop(note, 100)
+                self._events.append((start_time, self._elapsed(), note, velocity, channel))
+                if self.on_note_off:
+                    self._callback_queue.append((NOTE_OFF, note, 0, channel))
+    
+    def _flush_callbacks(self):
+        """批量派发待处理的回调 (在锁内取出一批, 在锁外调用, 回调里可以再次录音)"""
+        with self.lock:
+            if not self._callback_queue:
+                return
+            batch = list(self._callback_queue)
+            self._callback_queue.clear()
+            on_note_on, on_note_off = self.on_note_on, self.on_note_off
+        
+        for kind, note, velocity, channel in batch:
+            if kind == NOTE_ON:
+                if on_note_on:
+                    on_note_on(note, velocity, channel)
+            elif on_note_off:
+                on_note_off(note, channel)
+    
+    def _flush_loop(self):
+        """回调派发线程"""
+        interval = 1.0 / CALLBACK_FLUSH_HZ
+        while not self._flush_stop.wait(interval):
+            self._flush_callbacks()
+        self._flush_callbacks()
+    
+    def _start_flush_thread(self):
+        """启动回调派发线程"""
+        self._stop_flush_thread()
+        self._flush_stop.clear()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+    
+    def _stop_flush_thread(self):
+        """停止回调派发线程 (退出前会派发完剩余回调)"""
+        if self._flush_thread is not None:
+            self._flush_stop.set()
+            self._flush_thread.join()
+            self._flush_thread = None
     
     def start_playback(self, track: PerformanceTrack) -> bool:
         """开始回放"""
@@ -3,9 +3,57 @@
 
 import json
 import os
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 预设库JSON解析缓存 (按 路径+mtime+大小 索引)
+LIBRARY_CACHE_SIZE = 16
+_library_cache: 'OrderedDict[Tuple[str, int, int], Dict[str, Any]]' = OrderedDict()
+
+
+def _library_cache_key(path: str) -> Tuple[str, int, int]:
+    """文件的缓存键, 文件被改写后自动失效"""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def _cache_library_data(key: Tuple[str, int, int], data: Dict[str, Any]):
+    """写入LRU缓存"""
+    _library_cache[key] = data
+    _library_cache.move_to_end(key)
+    if len(_library_cache) > LIBRARY_CACHE_SIZE:
+        _library_cache.popitem(last=False)
+
+
+def _clone_tree(obj):
+    """复制JSON树 (只含dict/list/标量), 避免预设修改污染缓存"""
+    if isinstance(obj, dict):
+        return {k: _clone_tree(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clone_tree(v) for v in obj]
+    return obj
+
+
+def _load_library_data(path: str) -> Dict[str, Any]:
+    """读取预设库JSON, 命中缓存时跳过解析"""
+    key = _library_cache_key(path)
+    data = _library_cache.get(key)
+    if data is None:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        _cache_library_data(key, data)
+    else:
+        _library_cache.move_to_end(key)
+    return data
+
 # ============ 预设库 ============
 
 class Preset:
@@ -108,9 +156,13 @@ class PresetLibrary:
             library_path: 预设库路径，默认使用内置预设
         """
         self.presets: Dict[str, Preset] = {}
+        self._by_category: Dict[str, Dict[str, Preset]] = defaultdict(dict)  # 类别 -> {名称: 预设}
         self.library_path = library_path
         self.current_category = 'All'
         
+        # 搜索索引 (增删预设后惰性重建)
+        self._search_index: Optional[Tuple[List[Preset], List[Tuple[str, ...]], Dict[str, set]]] = None
+        
         # 加载预设
         if library_path and os.path.exists(library_path):
             self.load_library(library_path)
@@ -266,12 +318,26 @@ class PresetLibrary:
     
     def add_preset(self, preset: Preset):
         """添加预设"""
+        old = self.presets.get(preset.name)
+        if old is not None and old.category != preset.category:
+            self._remove_from_category(old)
         self.presets[preset.name] = preset
+        self._by_category[preset.category][preset.name] = preset
+        self._search_index = None
     
     def remove_preset(self, name: str):
         """移除预设"""
         if name in self.presets:
-            del self.presets[name]
+            self._remove_from_category(self.presets.pop(name))
+            self._search_index = None
+    
+    def _remove_from_category(self, preset: Preset):
+        """从类别索引中移除预设"""
+        bucket = self._by_category.get(preset.category)
+        if bucket is not None:
+            bucket.pop(preset.name, None)
+            if not bucket:
+                del self._by_category[preset.category]
     
     def get_preset(self, name: str) -> Optional[Preset]:
         """获取预设"""
@@ -281,23 +347,51 @@ class PresetLibrary:
         """按类别获取预设"""
         if category == 'All':
             return list(self.presets.values())
-        return [p for p in self.presets.values() if p.category == category]
+        bucket = self._by_category.get(category)
+        return list(bucket.values()) if bucket else []
     
     def get_categories(self) -> List[str]:
         """获取所有类别"""
-        categories = set(p.category for p in self.presets.values())
-        return ['All'] + sorted(categories)
+        return ['All'] + sorted(self._by_category)
+    
+    def _build_search_index(self):
+        """构建三元组倒排索引: trigram -> 预设序号集合"""
+        presets = list(self.presets.values())
+        texts = []
+        trigrams: Dict[str, set] = defaultdict(set)
+        for idx, preset in enumerate(presets):
+            fields = (preset.name.lower(), preset.description.lower(),
+                      *(tag.lower() for tag in preset.tags))
+            texts.append(fields)
+            for text in fields:
+                for i in range(len(text) - 2):
+                    trigrams[text[i:i + 3]].add(idx)
+        self._search_index = (presets, texts, dict(trigrams))
     
     def search_presets(self, query: str) -> List[Preset]:
-        """搜索预设（按名称、描述、标签）"""
+        """搜索预设（按名称、描述、标签）
+        
+        先用三元组索引求候选集, 再做子串匹配确认; 结果顺序与预设添加顺序一致。
+        """
         query = query.lower()
-        results = []
-        for preset in self.presets.values():
-            if (query in preset.name.lower() or 
-                query in preset.description.lower() or
-                any(query in tag.lower() for tag in preset.tags)):
-                results.append(preset)
-        return results
+        if self._search_index is None:
+            self._build_search_index()
+        presets, texts, trigrams = self._search_index
+        
+        if len(query) < 3:
+            candidates = range(len(presets))
+        else:
+            grams = sorted({query[i:i + 3] for i in range(len(query) - 2)},
+                           key=lambda g: len(trigrams.get(g, ())))
+            candidate_set = set(trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidate_set:
+                    break
+                candidate_set &= trigrams.get(gram, set())
+            candidates = sorted(candidate_set)
+        
+        return [presets[idx] for idx in candidates
+                if any(query in text for text in texts[idx])]
     
     def save_library(self, path: str = None):
         """保存预设库到JSON文件"""
@@ -314,15 +408,17 @@ class PresetLibrary:
         with open(save_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         
+        # 预热解析缓存, 随后的 PresetLibrary(save_path) 无需重新解析
+        _cache_library_data(_library_cache_key(save_path), _clone_tree(data))
+        
         return save_path
     
     def load_library(self, path: str):
         """从JSON文件加载预设库"""
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_library_data(path)
         
         for name, preset_data in data.get('presets', {}).items():
-            preset = Preset.from_dict(preset_data)
+            preset = Preset.from_dict(_clone_tree(preset_data))
             self.add_preset(preset)
     
     def export_preset(self, name: str, path: str):
@@ -354,14 +450,12 @@ class PresetLibrary:
     
     def get_stats(self) -> Dict[str, Any]:
         """获取库统计信息"""
-        categories = {}
-        for preset in self.presets.values():
-            categories[preset.category] = categories.get(preset.category, 0) + 1
+        categories = {category: len(bucket) for category, bucket in self._by_category.items()}
         
         return {
             'total_presets': len(self.presets),
             'categories': categories,
-            'user_presets': len([p for p in self.presets.values() if p.category == 'User'])
+            'user_presets': categories.get('User', 0)
         }
 
 
@@ -1,6 +1,7 @@
 # 🎹 实时音频播放器模块
 
 import numpy as np
+import queue
 import sounddevice as sd
 import threading
 from .core_modules import Oscillator, Filter, Envelope, MultiOscillator
@@ -37,6 +38,9 @@ class RealTimeSynth:
         # 音频流
         self.stream = None
 
+        # UI线程投递的命令队列: (方法名, 参数), 由音频回调在每个缓冲区开始时执行
+        self._commands = queue.SimpleQueue()
+
     def start(self):
         """启动音频流"""
         if self.stream is None:
@@ -58,8 +62,26 @@ class RealTimeSynth:
         self.is_playing = False
         self.current_note = None
 
+    def send(self, method, *args):
+        """从UI线程投递命令, 立即返回 (音频流运行时由音频线程执行)"""
+        if self.stream is None:
+            getattr(self, method)(*args)
+        else:
+            self._commands.put((method, args))
+
+    def _drain_commands(self):
+        """执行所有待处理的命令"""
+        while True:
+            try:
+                method, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            getattr(self, method)(*args)
+
     def _audio_callback(self, outdata, frames, time, status):
         """音频回调函数"""
+        self._drain_commands()
+
         # 生成静音
         audio_data = np.zeros(frames, dtype=np.float32)
 
@@ -98,6 +120,10 @@ class RealTimeSynth:
         """设置音量 (0.0 - 1.0)"""
         self.volume = max(0.0, min(1.0, volume))
 
+    def adjust_volume(self, delta):
+        """在当前音量基础上调节"""
+        self.set_volume(self.volume + delta)
+
     def set_wave_type(self, wave_type):
         """设置波形类型"""
         self.oscillator.set_wave_type(wave_type)
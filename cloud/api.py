@@ -6,8 +6,10 @@ Flask API端点 - 用户认证、预设管理、分享
 from flask import Flask, request, jsonify, g
 from functools import wraps
 from typing import Callable
+import atexit
 import os
 import sys
+import weakref
 
 # 添加父目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,6 +17,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from cloud.user import UserManager
 from cloud.preset_storage import PresetCloudStorage
 
+# create_app创建过的预设存储; 退出时统一写入尚未落盘的点赞/下载计数
+_preset_storages = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_preset_storages() -> None:
+    """退出时写入所有预设存储的待落盘计数"""
+    for storage in list(_preset_storages):
+        storage.flush()
+
 
 def create_app(
     user_storage_path: str = './data/users',
@@ -28,6 +40,7 @@ def create_app(
     # 初始化管理器
     user_manager = UserManager(user_storage_path)
     preset_storage = PresetCloudStorage(preset_storage_path)
+    _preset_storages.add(preset_storage)
     
     # 将管理器保存到app配置
     app.config['USER_MANAGER'] = user_manager
@@ -271,20 +284,22 @@ def create_app(
         # 增加下载计数
         preset_storage.download_preset(preset_id)
         
-        return jsonify({
-            'preset': {
-                'preset_id': preset.preset_id,
-                'name': preset.name,
-                'description': preset.description,
-                'category': preset.category,
-                'tags': preset.tags,
-                'preset_data': preset.preset_data,
-                'likes': preset.likes,
-                'downloads': preset.downloads,
-                'author_name': preset.author_name,
-                'created_at': preset.created_at
-            }
-        })
+        # preset_data使用预编码的JSON片段拼接, 不再逐次序列化
+        fields = app.json.dumps({
+            'preset_id': preset.preset_id,
+            'name': preset.name,
+            'description': preset.description,
+            'category': preset.category,
+            'tags': preset.tags,
+            'likes': preset.likes,
+            'downloads': preset.downloads,
+            'author_name': preset.author_name,
+            'created_at': preset.created_at
+        }).encode()
+        body = b''.join((
+            b'{"preset":', fields[:-1], b',"preset_data":', preset.preset_data_json, b'}}\n'
+        ))
+        return app.response_class(body, mimetype='application/json')
     
     @app.route('/api/v1/presets/<preset_id>', methods=['PUT'])
     @require_auth
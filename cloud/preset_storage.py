@@ -8,10 +8,23 @@ import secrets
 import json
 import os
 import base64
+import heapq
+import time
 import zlib
+from collections import defaultdict
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List, Set, Tuple
+from dataclasses import dataclass, fields
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 点赞/下载计数只更新内存, 累计到一定次数或时间后批量写盘
+FLUSH_EVERY_OPS = 100
+FLUSH_INTERVAL_S = 1.0
 
 
 @dataclass
@@ -38,9 +51,45 @@ class CloudPreset:
         if not self.updated_at:
             self.updated_at = self.created_at
     
+    def __setattr__(self, name, value):
+        # 替换preset_data时丢弃已编码的JSON
+        if name == 'preset_data':
+            self.invalidate_data_json()
+        super().__setattr__(name, value)
+    
+    def _encode_data(self) -> bytes:
+        """把preset_data编码为紧凑JSON"""
+        if HAS_ORJSON:
+            return orjson.dumps(self.preset_data)
+        return json.dumps(self.preset_data, separators=(',', ':')).encode()
+    
+    def invalidate_data_json(self) -> None:
+        """丢弃缓存的preset_data编码 (原地修改preset_data后必须调用)"""
+        self.__dict__.pop('_data_json', None)
+    
+    @property
+    def preset_data_json(self) -> bytes:
+        """preset_data的紧凑JSON编码 (编码一次, 之后直接复用)
+        
+        缓存只在preset_data被重新赋值时自动失效; 原地修改字典后
+        需要调用invalidate_data_json, 否则to_dict/API返回旧数据。
+        """
+        data_json = self.__dict__.get('_data_json')
+        if data_json is None:
+            data_json = self.__dict__['_data_json'] = self._encode_data()
+        return data_json
+    
+    def _field_values(self) -> Dict[str, Any]:
+        """字段字典 (不复制, 仅供内部序列化使用)"""
+        attrs = self.__dict__
+        return {name: attrs[name] for name in _CLOUD_PRESET_FIELDS}
+    
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return asdict(self)
+        """转换为字典 (tags/preset_data为独立副本, preset_data由缓存的JSON解码得到)"""
+        data = self._field_values()
+        data['tags'] = list(self.tags)
+        data['preset_data'] = orjson.loads(self.preset_data_json) if HAS_ORJSON else json.loads(self.preset_data_json)
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CloudPreset':
@@ -50,8 +99,7 @@ class CloudPreset:
     @property
     def compressed_data(self) -> str:
         """获取压缩后的数据（用于分享链接）"""
-        json_str = json.dumps(self.preset_data)
-        compressed = zlib.compress(json_str.encode(), level=9)
+        compressed = zlib.compress(self.preset_data_json, level=9)
         return base64.urlsafe_b64encode(compressed).decode()
     
     @classmethod
@@ -76,6 +124,9 @@ class CloudPreset:
         }
 
 
+_CLOUD_PRESET_FIELDS = tuple(f.name for f in fields(CloudPreset))
+
+
 class PresetCloudStorage:
     """云端预设存储服务"""
     
@@ -88,6 +139,22 @@ class PresetCloudStorage:
         
         self.presets: Dict[str, CloudPreset] = {}
         self.user_presets: Dict[str, List[str]] = {}  # user_id -> [preset_ids]
+        
+        # 倒排索引: 标签 / 小写类别 / 小写三元组 -> 预设ID集合
+        self._by_tag: Dict[str, Set[str]] = defaultdict(set)
+        self._by_category: Dict[str, Set[str]] = defaultdict(set)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._search_texts: Dict[str, Tuple[str, ...]] = {}  # 预设ID -> 小写的可搜索字段
+        self._seq: Dict[str, int] = {}  # 预设ID -> 加入顺序, 用于保持结果顺序
+        self._next_seq = 0
+        
+        # 计数已修改但尚未写盘的预设
+        self._dirty: Set[str] = set()
+        self._pending_ops = 0
+        self._last_flush = time.monotonic()
+        
+        # 热门预设缓存: limit -> 结果 (任何影响排名的修改都会清空)
+        self._popular_cache: Dict[int, List[CloudPreset]] = {}
         self._load_presets()
     
     def _get_preset_file(self, preset_id: str) -> str:
@@ -114,6 +181,7 @@ class PresetCloudStorage:
                             data = json.load(f)
                             preset = CloudPreset.from_dict(data)
                             self.presets[preset_id] = preset
+                            self._index_preset(preset_id, preset)
                             
                             # 记录用户预设
                             if preset.user_id not in self.user_presets:
@@ -123,13 +191,50 @@ class PresetCloudStorage:
                     except Exception as e:
                         print(f"Error loading preset {filename}: {e}")
     
+    def _index_preset(self, preset_id: str, preset: CloudPreset) -> None:
+        """把预设加入标签/类别/三元组索引"""
+        if preset_id not in self._seq:
+            self._seq[preset_id] = self._next_seq
+            self._next_seq += 1
+        
+        for tag in preset.tags:
+            self._by_tag[tag].add(preset_id)
+        self._by_category[preset.category.lower()].add(preset_id)
+        
+        texts = (preset.name.lower(), preset.description.lower(), preset.category.lower(),
+                 *(tag.lower() for tag in preset.tags))
+        self._search_texts[preset_id] = texts
+        for text in texts:
+            for i in range(len(text) - 2):
+                self._trigrams[text[i:i + 3]].add(preset_id)
+    
+    def _unindex_preset(self, preset_id: str, preset: CloudPreset) -> None:
+        """把预设移出索引 (保留加入顺序)"""
+        def discard(index, key):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(preset_id)
+                if not bucket:
+                    del index[key]
+        
+        for tag in preset.tags:
+            discard(self._by_tag, tag)
+        discard(self._by_category, preset.category.lower())
+        for text in self._search_texts.pop(preset_id, ()):
+            for i in range(len(text) - 2):
+                discard(self._trigrams, text[i:i + 3])
+    
+    def _in_order(self, preset_ids) -> List[CloudPreset]:
+        """按加入顺序返回预设"""
+        return [self.presets[pid] for pid in sorted(preset_ids, key=self._seq.__getitem__)]
+    
     def _save_preset(self, preset: CloudPreset) -> None:
         """保存预设到磁盘"""
         # 保存数据文件
         folder = 'public' if preset.is_public else 'private'
         filepath = os.path.join(self.storage_path, folder, f'{preset.preset_id}.json')
         with open(filepath, 'w') as f:
-            json.dump(preset.to_dict(), f, indent=2)
+            json.dump(preset._field_values(), f, indent=2)
         
         # 保存元数据（用于搜索）
         meta = {
@@ -149,6 +254,24 @@ class PresetCloudStorage:
         with open(meta_path, 'w') as f:
             json.dump(meta, f, indent=2)
     
+    def _mark_dirty(self, preset_id: str) -> None:
+        """记录待写盘的预设, 达到次数/时间阈值时批量写盘"""
+        self._dirty.add(preset_id)
+        self._pending_ops += 1
+        if (self._pending_ops >= FLUSH_EVERY_OPS or
+                time.monotonic() - self._last_flush >= FLUSH_INTERVAL_S):
+            self.flush()
+    
+    def flush(self) -> None:
+        """把所有待写盘的预设写入磁盘"""
+        dirty, self._dirty = self._dirty, set()
+        for preset_id in dirty:
+            preset = self.presets.get(preset_id)
+            if preset is not None:
+                self._save_preset(preset)
+        self._pending_ops = 0
+        self._last_flush = time.monotonic()
+    
     def create_preset(
         self,
         user_id: str,
@@ -174,9 +297,13 @@ class PresetCloudStorage:
             is_public=is_public,
             author_name=author_name
         )
+        # 创建时即编码preset_data, 之后的响应/分享链接直接复用
+        preset._data_json = preset._encode_data()
         
         # 保存
         self.presets[preset_id] = preset
+        self._index_preset(preset_id, preset)
+        self._popular_cache.clear()
         if user_id not in self.user_presets:
             self.user_presets[user_id] = []
         self.user_presets[user_id].append(preset_id)
@@ -206,15 +333,17 @@ class PresetCloudStorage:
         sort_by: str = "created_at"
     ) -> List[CloudPreset]:
         """列出公开预设（支持过滤和排序）"""
-        presets = [p for p in self.presets.values() if p.is_public]
-        
-        # 分类过滤
-        if category:
-            presets = [p for p in presets if p.category.lower() == category.lower()]
-        
-        # 标签过滤
-        if tags:
-            presets = [p for p in presets if any(t in p.tags for t in tags)]
+        if category or tags:
+            # 通过索引取候选集
+            candidates = None
+            if category:
+                candidates = set(self._by_category.get(category.lower(), ()))
+            if tags:
+                tagged = set().union(*(self._by_tag.get(t, ()) for t in tags))
+                candidates = tagged if candidates is None else candidates & tagged
+            presets = [p for p in self._in_order(candidates) if p.is_public]
+        else:
+            presets = [p for p in self.presets.values() if p.is_public]
         
         # 排序
         if sort_by == "likes":
@@ -231,22 +360,33 @@ class PresetCloudStorage:
         query: str,
         limit: int = 20
     ) -> List[CloudPreset]:
-        """搜索预设"""
+        """搜索预设（名称、描述、类别、标签）
+        
+        先用三元组索引求候选集, 再做子串匹配确认; 结果顺序与预设加入顺序一致。
+        """
         query = query.lower()
-        results = []
         
-        for preset in self.presets.values():
-            if not preset.is_public:
-                continue
-            
-            # 搜索名称、描述、标签
-            if (query in preset.name.lower() or
-                query in preset.description.lower() or
-                query in preset.category.lower() or
-                any(query in tag.lower() for tag in preset.tags)):
+        if len(query) < 3:
+            candidates = self.presets
+        else:
+            grams = sorted({query[i:i + 3] for i in range(len(query) - 2)},
+                           key=lambda g: len(self._trigrams.get(g, ())))
+            candidate_set = set(self._trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidate_set:
+                    break
+                candidate_set &= self._trigrams.get(gram, set())
+            candidates = sorted(candidate_set, key=self._seq.__getitem__)
+        
+        results = []
+        for pid in candidates:
+            preset = self.presets[pid]
+            if preset.is_public and any(query in text for text in self._search_texts[pid]):
                 results.append(preset)
+                if len(results) >= limit:
+                    break
         
-        return results[:limit]
+        return results
     
     def update_preset(
         self,
@@ -259,12 +399,18 @@ class PresetCloudStorage:
         if not preset or preset.user_id != user_id:
             return None
         
+        self._unindex_preset(preset_id, preset)
+        # 调用方可能已经原地修改过preset_data, 更新时总是重新编码
+        preset.invalidate_data_json()
         allowed_fields = ['name', 'description', 'tags', 'is_public', 'preset_data']
         for field, value in kwargs.items():
             if field in allowed_fields:
                 setattr(preset, field, value)
+        self._index_preset(preset_id, preset)
+        self._popular_cache.clear()
         
         preset.updated_at = datetime.now().isoformat()
+        self._dirty.discard(preset_id)
         self._save_preset(preset)
         
         return preset
@@ -286,27 +432,33 @@ class PresetCloudStorage:
             os.remove(meta_path)
         
         # 从内存中移除
+        self._dirty.discard(preset_id)
+        self._unindex_preset(preset_id, preset)
+        del self._seq[preset_id]
         del self.presets[preset_id]
+        self._popular_cache.clear()
         if user_id in self.user_presets and preset_id in self.user_presets[user_id]:
             self.user_presets[user_id].remove(preset_id)
         
         return True
     
     def like_preset(self, preset_id: str) -> bool:
-        """点赞预设"""
+        """点赞预设 (延迟写盘, 见flush)"""
         preset = self.presets.get(preset_id)
         if preset:
             preset.likes += 1
-            self._save_preset(preset)
+            self._popular_cache.clear()
+            self._mark_dirty(preset_id)
             return True
         return False
     
     def download_preset(self, preset_id: str) -> bool:
-        """下载预设"""
+        """下载预设 (延迟写盘, 见flush)"""
         preset = self.presets.get(preset_id)
         if preset:
             preset.downloads += 1
-            self._save_preset(preset)
+            self._popular_cache.clear()
+            self._mark_dirty(preset_id)
             return True
         return False
     
@@ -317,10 +469,16 @@ class PresetCloudStorage:
         return presets[:limit]
     
     def get_popular_presets(self, limit: int = 10) -> List[CloudPreset]:
-        """获取最热门的预设"""
-        presets = [p for p in self.presets.values() if p.is_public]
-        presets.sort(key=lambda p: (p.likes + p.downloads * 2), reverse=True)
-        return presets[:limit]
+        """获取最热门的预设 (只取前limit个, 结果缓存到下次修改)"""
+        cached = self._popular_cache.get(limit)
+        if cached is None:
+            cached = heapq.nlargest(
+                limit,
+                (p for p in self.presets.values() if p.is_public),
+                key=lambda p: p.likes + p.downloads * 2
+            )
+            self._popular_cache[limit] = cached
+        return list(cached)
 
 
 if __name__ == '__main__':
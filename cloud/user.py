@@ -4,66 +4,139 @@
 """
 
 import hashlib
+import hmac
 import secrets
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Token有效期 (纳秒)
+TOKEN_TTL_NS = 30 * 86400 * 1_000_000_000
+
+# token数量超过此阈值时, 合并进紧凑的有序数组表
+TOKEN_TABLE_THRESHOLD = 100_000
+
+# token验证结果缓存 (有效期不超过token本身的过期时间)
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL_NS = 10 * 1_000_000_000
+
+# 加载用户文件的最大线程数
+LOAD_WORKERS = 16
+
+# 调试用: MSYNTH_PRETTY_JSON=1 时以缩进格式保存用户文件
+PRETTY_JSON = os.environ.get('MSYNTH_PRETTY_JSON') == '1'
 
 
 class User:
     """用户账户模型"""
     
+    __slots__ = (
+        'user_id', 'username', 'email', 'password_hash',
+        '_created_at', '_created_at_str', '_last_login', '_last_login_str',
+        'preset_count', 'is_public'
+    )
+    
     def __init__(
         self,
         user_id: str,
         username: str,
         email: str,
         password_hash: str,
-        created_at: Optional[datetime] = None,
-        last_login: Optional[datetime] = None,
+        created_at: Optional[Union[datetime, str]] = None,
+        last_login: Optional[Union[datetime, str]] = None,
         preset_count: int = 0,
         is_public: bool = True
     ):
+        """
+        created_at / last_login 也可以传入ISO格式字符串,
+        字符串会保留原样, 直到第一次访问对应属性时才解析为datetime
+        """
         self.user_id = user_id
         self.username = username
         self.email = email
         self.password_hash = password_hash
-        self.created_at = created_at or datetime.now()
-        self.last_login = last_login
+        
+        if isinstance(created_at, str):
+            self._created_at, self._created_at_str = None, created_at
+        else:
+            self._created_at, self._created_at_str = created_at or datetime.now(), None
+        
+        if isinstance(last_login, str):
+            self._last_login, self._last_login_str = None, last_login
+        else:
+            self._last_login, self._last_login_str = last_login, None
+        
         self.preset_count = preset_count
         self.is_public = is_public
     
+    @property
+    def created_at(self) -> datetime:
+        """创建时间 (首次访问时解析)"""
+        if self._created_at is None:
+            self._created_at = datetime.fromisoformat(self._created_at_str)
+        return self._created_at
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_at, self._created_at_str = value, None
+    
+    @property
+    def last_login(self) -> Optional[datetime]:
+        """最后登录时间 (首次访问时解析)"""
+        if self._last_login is None and self._last_login_str is not None:
+            self._last_login = datetime.fromisoformat(self._last_login_str)
+        return self._last_login
+    
+    @last_login.setter
+    def last_login(self, value: Optional[datetime]) -> None:
+        self._last_login, self._last_login_str = value, None
+    
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
+        """转换为字典 (未修改过的时间字段直接使用原始字符串)"""
+        created_at = self._created_at_str or self._created_at.isoformat()
+        last_login = self._last_login_str
+        if last_login is None and self._last_login is not None:
+            last_login = self._last_login.isoformat()
         return {
             'user_id': self.user_id,
             'username': self.username,
             'email': self.email,
             'password_hash': self.password_hash,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'created_at': created_at,
+            'last_login': last_login,
             'preset_count': self.preset_count,
             'is_public': self.is_public
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'User':
-        """从字典创建用户"""
+        """从字典创建用户 (时间字段延迟解析)"""
         return cls(
             user_id=data['user_id'],
             username=data['username'],
             email=data['email'],
             password_hash=data['password_hash'],
-            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None,
-            last_login=datetime.fromisoformat(data['last_login']) if data.get('last_login') else None,
+            created_at=data.get('created_at') or None,
+            last_login=data.get('last_login') or None,
             preset_count=data.get('preset_count', 0),
             is_public=data.get('is_public', True)
         )
     
     def verify_password(self, password: str) -> bool:
-        """验证密码"""
-        return self.password_hash == self.hash_password(password)
+        """验证密码 (常量时间比较, 损坏的哈希值视为不匹配)"""
+        return hmac.compare_digest(self.hash_password(password).encode(), self.password_hash.encode())
     
     @staticmethod
     def hash_password(password: str) -> str:
@@ -73,7 +146,7 @@ class User:
     @staticmethod
     def generate_user_id() -> str:
         """生成唯一用户ID"""
-        return f"user_{secrets.token_hex(8)}"
+        return f"user_{secrets.token_urlsafe(8)}"
 
 
 class UserManager:
@@ -83,35 +156,84 @@ class UserManager:
         self.storage_path = storage_path
         os.makedirs(storage_path, exist_ok=True)
         self.users: Dict[str, User] = {}
-        self.tokens: Dict[str, str] = {}  # token -> user_id
-        self.token_expiry: Dict[str, datetime] = {}
+        # 用户名/邮箱索引, 登录和注册查重为O(1)
+        self._by_username: Dict[str, User] = {}
+        self._by_email: Dict[str, User] = {}
+        self.tokens: Dict[bytes, str] = {}  # token摘要 -> user_id
+        self.token_expiry: Dict[bytes, int] = {}  # token摘要 -> 过期时间 (epoch ns)
+        # 紧凑token表: (摘要高64位, 摘要低64位, uint32用户序号, int64过期时间), 按(高, 低)有序,
+        # 大规模部署时使用
+        self._token_table: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._user_ordinals: Dict[str, int] = {}  # user_id -> 序号
+        self._ordinal_users: List[str] = []  # 序号 -> user_id
+        # token验证缓存: 摘要 -> (用户, 过期时间 epoch ns), 按LRU顺序淘汰
+        self._tok_cache: 'OrderedDict[bytes, Tuple[User, int]]' = OrderedDict()
         self._load_users()
     
     def _get_user_file(self, user_id: str) -> str:
         """获取用户文件路径"""
         return os.path.join(self.storage_path, f'{user_id}.json')
     
+    @staticmethod
+    def _read_user_file(filepath: str) -> Optional[Dict[str, Any]]:
+        """读取单个用户文件 (在线程池中执行)"""
+        try:
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        except Exception as e:
+            print(f"Error loading user {os.path.basename(filepath)}: {e}")
+            return None
+    
     def _load_users(self) -> None:
-        """从磁盘加载所有用户"""
+        """从磁盘加载所有用户 (文件读取与解析并行执行)"""
         if not os.path.exists(self.storage_path):
             return
         
-        for filename in os.listdir(self.storage_path):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.storage_path, filename)
+        with os.scandir(self.storage_path) as entries:
+            paths = [e.path for e in entries if e.name.endswith('.json')]
+        if not paths:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(paths))) as executor:
+            # 用户字典只在主线程写入, 无需加锁
+            for filepath, data in zip(paths, executor.map(self._read_user_file, paths)):
+                if data is None:
+                    continue
                 try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        user = User.from_dict(data)
-                        self.users[user.user_id] = user
+                    user = User.from_dict(data)
+                    self._add_user(user)
                 except Exception as e:
-                    print(f"Error loading user {filename}: {e}")
+                    print(f"Error loading user {os.path.basename(filepath)}: {e}")
+    
+    def _add_user(self, user: User) -> None:
+        """注册用户到内存表和索引 (用户名/邮箱已属于其他用户时抛出ValueError)"""
+        self._check_unique(user, user.username, user.email)
+        self.users[user.user_id] = user
+        self._by_username[user.username] = user
+        self._by_email[user.email] = user
+    
+    def _check_unique(self, user: User, username: str, email: str) -> None:
+        """检查用户名和邮箱没有被其他用户占用"""
+        owner = self._by_username.get(username)
+        if owner is not None and owner is not user:
+            raise ValueError(f"用户名 '{username}' 已被使用")
+        owner = self._by_email.get(email)
+        if owner is not None and owner is not user:
+            raise ValueError(f"邮箱 '{email}' 已被注册")
     
     def _save_user(self, user: User) -> None:
         """保存用户到磁盘"""
         filepath = self._get_user_file(user.user_id)
-        with open(filepath, 'w') as f:
-            json.dump(user.to_dict(), f, indent=2)
+        data = user.to_dict()
+        if PRETTY_JSON:
+            payload = json.dumps(data, indent=2).encode()
+        elif HAS_ORJSON:
+            payload = orjson.dumps(data)
+        else:
+            payload = json.dumps(data, separators=(',', ':')).encode()
+        with open(filepath, 'wb') as f:
+            f.write(payload)
     
     def create_user(
         self,
@@ -127,11 +249,10 @@ class UserManager:
             tuple: (User实例, API Token)
         """
         # 检查用户名和邮箱是否已存在
-        for user in self.users.values():
-            if user.username == username:
-                raise ValueError(f"用户名 '{username}' 已被使用")
-            if user.email == email:
-                raise ValueError(f"邮箱 '{email}' 已被注册")
+        if username in self._by_username:
+            raise ValueError(f"用户名 '{username}' 已被使用")
+        if email in self._by_email:
+            raise ValueError(f"邮箱 '{email}' 已被注册")
         
         # 创建新用户
         user_id = User.generate_user_id()
@@ -149,7 +270,7 @@ class UserManager:
         token = self._generate_token(user_id)
         
         # 保存
-        self.users[user_id] = user
+        self._add_user(user)
         self._save_user(user)
         
         return user, token
@@ -161,12 +282,8 @@ class UserManager:
         Returns:
             tuple: (User实例, API Token)
         """
-        # 查找用户
-        user = None
-        for u in self.users.values():
-            if u.username == username:
-                user = u
-                break
+        # 查找用户 (只对这一个用户验证密码)
+        user = self._by_username.get(username)
         
         if not user:
             raise ValueError("用户不存在")
@@ -184,33 +301,135 @@ class UserManager:
         
         return user, token
     
+    @staticmethod
+    def _token_key(token: str) -> bytes:
+        """token的内部索引键 (只保存摘要, 不保存明文token)"""
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    @staticmethod
+    def _split_token_key(key: bytes) -> Tuple[int, int]:
+        """把16字节摘要拆成两个uint64 (高位, 低位), 大端序保证数值顺序与字节顺序一致"""
+        return int.from_bytes(key[:8], 'big'), int.from_bytes(key[8:], 'big')
+    
     def _generate_token(self, user_id: str) -> str:
         """生成API token"""
-        token = secrets.token_hex(32)
-        self.tokens[token] = user_id
-        self.token_expiry[token] = datetime.now() + timedelta(days=30)
+        token = secrets.token_urlsafe(32)
+        key = self._token_key(token)
+        self.tokens[key] = user_id
+        self.token_expiry[key] = time.time_ns() + TOKEN_TTL_NS
+        if len(self.tokens) > TOKEN_TABLE_THRESHOLD:
+            self._compact_tokens()
         return token
     
+    def _compact_tokens(self) -> None:
+        """将token字典合并进紧凑的有序数组表, 并清空字典"""
+        now = time.time_ns()
+        keys_hi, keys_lo, ordinals, expiry = [], [], [], []
+        for key, user_id in self.tokens.items():
+            expires = self.token_expiry.get(key, 0)
+            if expires < now:
+                continue
+            ordinal = self._user_ordinals.get(user_id)
+            if ordinal is None:
+                ordinal = len(self._ordinal_users)
+                self._user_ordinals[user_id] = ordinal
+                self._ordinal_users.append(user_id)
+            hi, lo = self._split_token_key(key)
+            keys_hi.append(hi)
+            keys_lo.append(lo)
+            ordinals.append(ordinal)
+            expiry.append(expires)
+        
+        new_hi = np.array(keys_hi, dtype=np.uint64)
+        new_lo = np.array(keys_lo, dtype=np.uint64)
+        new_ordinals = np.array(ordinals, dtype=np.uint32)
+        new_expiry = np.array(expiry, dtype=np.int64)
+        
+        if self._token_table is not None:
+            old_hi, old_lo, old_ordinals, old_expiry = self._token_table
+            alive = old_expiry >= now
+            new_hi = np.concatenate([old_hi[alive], new_hi])
+            new_lo = np.concatenate([old_lo[alive], new_lo])
+            new_ordinals = np.concatenate([old_ordinals[alive], new_ordinals])
+            new_expiry = np.concatenate([old_expiry[alive], new_expiry])
+        
+        # 按完整的128位摘要排序 (先高位后低位)
+        order = np.lexsort((new_lo, new_hi))
+        self._token_table = (new_hi[order], new_lo[order], new_ordinals[order], new_expiry[order])
+        self.tokens.clear()
+        self.token_expiry.clear()
+    
+    def _find_table_token(self, key: bytes) -> int:
+        """在紧凑token表中按完整摘要二分查找, 返回下标 (未找到返回-1)"""
+        if self._token_table is None:
+            return -1
+        keys_hi, keys_lo = self._token_table[0], self._token_table[1]
+        hi, lo = self._split_token_key(key)
+        hi, lo = np.uint64(hi), np.uint64(lo)
+        # 先定位高位相同的区间, 再在区间内比较低位
+        start = int(np.searchsorted(keys_hi, hi, side='left'))
+        end = int(np.searchsorted(keys_hi, hi, side='right'))
+        if start == end:
+            return -1
+        idx = start + int(np.searchsorted(keys_lo[start:end], lo))
+        if idx < end and keys_lo[idx] == lo:
+            return idx
+        return -1
+    
     def verify_token(self, token: str) -> Optional[User]:
-        """验证token并返回用户"""
-        if token not in self.tokens:
-            return None
+        """验证token并返回用户 (短时间内重复验证同一token直接命中缓存)"""
+        key = self._token_key(token)
+        now = time.time_ns()
+        
+        cached = self._tok_cache.get(key)
+        if cached is not None:
+            if cached[1] > now:
+                self._tok_cache.move_to_end(key)
+                return cached[0]
+            del self._tok_cache[key]
+        
+        user, expires = self._lookup_token(key, now)
+        if user is not None:
+            self._tok_cache[key] = (user, min(expires, now + TOKEN_CACHE_TTL_NS))
+            if len(self._tok_cache) > TOKEN_CACHE_SIZE:
+                self._tok_cache.popitem(last=False)
+        return user
+    
+    def _lookup_token(self, key: bytes, now: int) -> Tuple[Optional[User], int]:
+        """查找token对应的用户, 返回 (用户, token过期时间)"""
+        if key not in self.tokens:
+            # 回退到紧凑token表
+            idx = self._find_table_token(key)
+            if idx < 0:
+                return None, 0
+            _, _, ordinals, expiry = self._token_table
+            if expiry[idx] < now:
+                return None, 0
+            return self.users.get(self._ordinal_users[ordinals[idx]]), int(expiry[idx])
         
         # 检查是否过期
-        if token in self.token_expiry and self.token_expiry[token] < datetime.now():
-            del self.tokens[token]
-            del self.token_expiry[token]
-            return None
+        expires = self.token_expiry.get(key, 0)
+        if expires < now:
+            del self.tokens[key]
+            self.token_expiry.pop(key, None)
+            return None, 0
         
-        user_id = self.tokens[token]
-        return self.users.get(user_id)
+        user_id = self.tokens[key]
+        return self.users.get(user_id), expires
     
     def logout(self, token: str) -> bool:
         """注销/使token失效"""
-        if token in self.tokens:
-            del self.tokens[token]
-            if token in self.token_expiry:
-                del self.token_expiry[token]
+        key = self._token_key(token)
+        self._tok_cache.pop(key, None)
+        if key in self.tokens:
+            del self.tokens[key]
+            self.token_expiry.pop(key, None)
+            return True
+        
+        idx = self._find_table_token(key)
+        if idx >= 0 and self._token_table[3][idx] > 0:
+            # 标记为过期, 下次合并时移除
+            self._token_table[3][idx] = 0
             return True
         return False
     
@@ -220,10 +439,7 @@ class UserManager:
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """通过用户名获取用户"""
-        for user in self.users.values():
-            if user.username == username:
-                return user
-        return None
+        return self._by_username.get(username)
     
     def list_users(self, limit: int = 50) -> list[User]:
         """列出所有公开用户（用于社区浏览）"""
@@ -235,11 +451,21 @@ class UserManager:
         if not user:
             return None
         
+        # 修改任何索引之前先检查新的用户名/邮箱是否已被其他用户占用
+        self._check_unique(user, kwargs.get('username', user.username), kwargs.get('email', user.email))
+        
+        # 先移出旧的用户名/邮箱索引, 更新后重新加入
+        del self._by_username[user.username]
+        del self._by_email[user.email]
+        
         allowed_fields = ['username', 'email', 'is_public']
         for field, value in kwargs.items():
             if field in allowed_fields:
                 setattr(user, field, value)
         
+        self._by_username[user.username] = user
+        self._by_email[user.email] = user
+        
         self._save_user(user)
         return user
 
@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from audio.midi_input import MIDIInputHandler, MIDISynthBridge, SimpleSynth
+import threading
 import time
 
 
@@ -15,10 +16,19 @@ def main():
     print("🎹 Modular Synth Studio - MIDI键盘输入演示")
     print("=" * 50)
     
-    # 创建MIDI处理器和合成器
-    handler = MIDIInputHandler()
+    # 创建MIDI处理器和合成器 (使用桥接器内部正在监听的处理器)
     synth = SimpleSynth()
     bridge = MIDISynthBridge(synth)
+    handler = bridge.midi
+    
+    # 按键事件: 由MIDI回调线程触发, 主线程阻塞等待
+    press_event = threading.Event()
+    
+    def on_note(data):
+        if data['type'] == 'note_on':
+            press_event.set()
+    
+    handler.add_callback(on_note)
     
     # 列出可用的MIDI设备
     bridge.list_devices()
@@ -31,7 +41,7 @@ def main():
         print("-" * 50)
         print("操作说明:")
         print("  • 按下音符键 → 触发声音")
-               print("  • 释放音符键 → 停止声音")
+        print("  • 释放音符键 → 停止声音")
         print("  • 移动旋钮/推子 → 显示CC值")
         print("  • 弯音轮 → 改变音高")
         print("-" * 50)
@@ -40,11 +50,13 @@ def main():
         
         try:
             while True:
-                time.sleep(0.1)
-                # 可选: 显示当前按下的音符
-                notes = handler.get_pressed_notes()
-                if notes:
-                    note = list(notes)[-1]  # 最后一个按下的音符
+                # 等待按键 (空闲时不占用CPU, 超时仅用于及时响应Ctrl+C)
+                if not press_event.wait(timeout=1.0):
+                    continue
+                press_event.clear()
+                # 可选: 显示最后一个按下的音符
+                note = handler.last_pressed
+                if note is not None:
                     print(f"📝 当前音符: {handler.note_to_name(note)} ({note}) | 频率: {handler.note_to_frequency(note):.1f}Hz")
         except KeyboardInterrupt:
             print("\n\n🛑 正在关闭...")
@@ -70,20 +70,20 @@ def test_simple_export():
     
     exporter = MIDIExporter()
     
-    # 创建简单旋律
+    # 创建简单旋律 (直接使用MIDI编号, 省去音符名称解析)
     melody = [
-        {'note': 'C4', 'duration': 1.0, 'velocity': 80},
-        {'note': 'D4', 'duration': 0.5, 'velocity': 80},
-        {'note': 'E4', 'duration': 0.5, 'velocity': 80},
-        {'note': 'F4', 'duration': 1.0, 'velocity': 80},
-        {'note': 'G4', 'duration': 1.0, 'velocity': 100},
-        {'note': 'A4', 'duration': 1.0, 'velocity': 100},
-        {'note': 'B4', 'duration': 0.5, 'velocity': 100},
-        {'note': 'C5', 'duration': 0.5, 'velocity': 100},
-        {'note': 'B4', 'duration': 0.5, 'velocity': 90},
-        {'note': 'A4', 'duration': 0.5, 'velocity': 90},
-        {'note': 'G4', 'duration': 1.0, 'velocity': 80},
-        {'note': 'F4', 'duration': 2.0, 'velocity': 80},
+        {'note': 60, 'duration': 1.0, 'velocity': 80},   # C4
+        {'note': 62, 'duration': 0.5, 'velocity': 80},   # D4
+        {'note': 64, 'duration': 0.5, 'velocity': 80},   # E4
+        {'note': 65, 'duration': 1.0, 'velocity': 80},   # F4
+        {'note': 67, 'duration': 1.0, 'velocity': 100},  # G4
+        {'note': 69, 'duration': 1.0, 'velocity': 100},  # A4
+        {'note': 71, 'duration': 0.5, 'velocity': 100},  # B4
+        {'note': 72, 'duration': 0.5, 'velocity': 100},  # C5
+        {'note': 71, 'duration': 0.5, 'velocity': 90},   # B4
+        {'note': 69, 'duration': 0.5, 'velocity': 90},   # A4
+        {'note': 67, 'duration': 1.0, 'velocity': 80},   # G4
+        {'note': 65, 'duration': 2.0, 'velocity': 80},   # F4
     ]
     
     result = exporter.export_melody(melody, 'output/simple_melody.mid', tempo=100)
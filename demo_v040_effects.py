@@ -12,9 +12,50 @@ import numpy as np
 from audio.core_modules import (
     Oscillator, Filter, Envelope, LFO, 
     Reverb, Delay, Distortion, EffectChain,
-    LFOModulator, AutomationManager
+    LFOModulator, AutomationManager, njit
 )
 
+
+@njit(cache=True, fastmath=True)
+def _render_block(phase_inc, env, cutoff, sample_rate, out):
+    """
+    融合渲染: 锯齿波振荡器 → 包络 → 低通滤波器(逐样本截止频率)
+    
+    所有状态都是标量局部变量, numba编译后为一个紧凑的原生循环
+    """
+    two_pi = 2.0 * np.pi
+    phase = 0.0
+    x1 = 0.0
+    x2 = 0.0
+    y1 = 0.0
+    y2 = 0.0
+    
+    for i in range(out.shape[0]):
+        # 振荡器 (与Oscillator.process_sample的锯齿波一致)
+        x = (2.0 * (phase / two_pi) - 1.0) * env[i]
+        phase += phase_inc
+        if phase >= two_pi:
+            phase -= two_pi
+        
+        # 低通biquad系数 (与Filter.process一致)
+        omega = two_pi * cutoff[i] / sample_rate
+        alpha = np.sin(omega) / 2.0
+        cos_omega = np.cos(omega)
+        a0 = 1.0 + alpha
+        b0 = (1.0 - cos_omega) / 2.0 / a0
+        b1 = (1.0 - cos_omega) / a0
+        a1 = -2.0 * cos_omega / a0
+        a2 = (1.0 - alpha) / a0
+        
+        y = b0 * x + b1 * x1 + b0 * x2 - a1 * y1 - a2 * y2
+        out[i] = y
+        x2 = x1
+        x1 = x
+        y2 = y1
+        y1 = y
+    
+    return out
+
 def demo_effect_chain():
     """演示效果器链"""
     print("=" * 50)
@@ -87,20 +128,13 @@ def demo_lfo_modulation():
     # 模拟处理
     print("\n🎵 实时调制演示 (2秒):")
     duration = 2.0
-    sample_rate = 44100
-    num_samples = int(duration * sample_rate)
     
-    # 生成带调制的音频
-    audio = np.zeros(num_samples)
+    # 生成带调制的音频: 一次性计算LFO曲线和逐样本频率 (与LFOModulator的频率调制公式一致)
+    base_freq = osc.frequency
+    lfo_values = lfo_freq.generate(duration)
+    freq_array = np.clip(base_freq + base_freq * 0.3 * 0.5 * lfo_values, 20, 20000)
     osc.phase = 0
-    
-    for i in range(num_samples):
-        # 处理调制
-        modulator.process(1)
-        
-        # 生成样本
-        sample = osc.process_sample()
-        audio[i] = sample
+    audio = osc.generate_from_freq(freq_array)
     
     print(f"✓ 生成了 {len(audio)} 个样本")
     print(f"✓ 频率范围: {osc.frequency:.1f} → ~{osc.frequency * 1.3:.1f} Hz")
@@ -177,24 +211,19 @@ def demo_full_signal_chain():
     sample_rate = 44100
     num_samples = int(duration * sample_rate)
     
-    audio = np.zeros(num_samples)
-    osc.phase = 0
     envelope_samples = envelope.process(num_samples)
     
     modulator.start()
     
-    for i in range(num_samples):
-        # 处理LFO调制
-        modulator.process(1)
-        
-        # 生成振荡器样本
-        sample = osc.process_sample()
-        
-        # 应用包络
-        sample *= envelope_samples[i]
-        
-        # 应用滤波器
-        audio[i] = filter_module.process(np.array([sample]))[0]
+    # 预先计算LFO调制后的截止频率曲线 (与LFOModulator的截止频率调制公式一致)
+    base_cutoff = filter_module.cutoff
+    cutoff = np.clip(base_cutoff + 5000 * 0.4 * lfo.generate(duration), 20, 20000)
+    
+    # 振荡器 → 包络 → 滤波器 融合为单个编译循环
+    audio = _render_block(
+        osc.phase_increment, envelope_samples, cutoff,
+        float(sample_rate), np.empty(num_samples)
+    )
     
     # 应用效果器链
     audio = effect_chain.process(audio)
@@ -12,6 +12,14 @@ import os
 import time
 import threading
 import numpy as np
+from scipy.signal import sawtooth
+
+try:
+    import tty
+    import termios
+    HAS_TTY = True
+except ImportError:
+    HAS_TTY = False
 
 # 添加路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -24,6 +32,33 @@ from audio.enhanced_effects_v070 import (
     FilterResonance, EnhancedEffectChain
 )
 
+# MIDI音符 (0-127) → 频率 查找表
+_FREQ_TABLE = (440.0 * np.exp2((np.arange(128) - 69) / 12.0)).astype(np.float32)
+
+# 锯齿波波表 (末尾追加首个样本, 便于在回绕处线性插值)
+_WT_SIZE = 2048
+_WT_SAW = sawtooth(2 * np.pi * np.arange(_WT_SIZE) / _WT_SIZE).astype(np.float32)
+_WT_SAW_GUARDED = np.append(_WT_SAW, _WT_SAW[0])
+_WT_INDEX = np.arange(_WT_SIZE + 1, dtype=np.float32)
+
+
+# 渲染用的复用缓冲区 (float32, 首次渲染时才分配), 重复渲染时不再分配/清零
+_SCRATCH = None
+
+
+def _scratch_buffer(num_samples):
+    """取出长度为num_samples的复用缓冲区视图 (下次调用时会被覆盖, 不要返回给调用者)"""
+    global _SCRATCH
+    if _SCRATCH is None or len(_SCRATCH) < num_samples:
+        _SCRATCH = np.empty(num_samples, dtype=np.float32)
+    return _SCRATCH[:num_samples]
+
+
+def _render_wavetable(freq, num_samples, sample_rate, table=_WT_SAW_GUARDED):
+    """波表合成: 相位累加 + 线性插值读取"""
+    phase = (np.arange(num_samples) * (_WT_SIZE * freq / sample_rate)) % _WT_SIZE
+    return np.interp(phase, _WT_INDEX, table).astype(np.float32)
+
 
 def demo_presets_v070():
     """演示v0.7.0扩展预设库"""
@@ -57,7 +92,7 @@ def demo_performance_recorder():
     
     # 设置回调
     def on_note_on(note, velocity, channel):
-        print(f"   🎵 按下: MIDI音符 {note} (频率: {440 * (2 ** ((note - 69) / 12)):.1f} Hz), 力度: {velocity}")
+        print(f"   🎵 按下: MIDI音符 {note} (频率: {_FREQ_TABLE[note]:.1f} Hz), 力度: {velocity}")
     
     def on_note_off(note, channel):
         print(f"   🔇 释放: MIDI音符 {note}")
@@ -112,7 +147,7 @@ def demo_enhanced_effects():
     
     # 生成测试信号
     t = np.linspace(0, duration, num_samples, False)
-    test_signal = 0.5 * np.sin(2 * np.pi * 440 * t)
+    test_signal = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
     
     # 测试相位器
     print("\n🎚️ 相位器效果...")
@@ -149,7 +184,7 @@ def demo_enhanced_effects():
     wavefolder.params.drive = 2.0
     wavefolder.params.mix = 0.5
     
-    loud_signal = 0.8 * np.sin(2 * np.pi * 220 * t)
+    loud_signal = (0.8 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
     output = wavefolder.process(loud_signal)
     print(f"   ✅ 波形折叠输出范围: [{output.min():.3f}, {output.max():.3f}]")
     
@@ -166,6 +201,21 @@ def demo_enhanced_effects():
     print("\n✅ 增强效果器演示完成！")
 
 
+def _adsr_block(num_samples, envelope):
+    """按包络参数一次性生成单个音符的增益曲线 (attack线性上升, decay线性下降到sustain)"""
+    sample_rate = envelope.sample_rate
+    gain = np.full(num_samples, envelope.sustain, dtype=np.float32)
+    
+    attack_samples = min(num_samples, int(envelope.attack * sample_rate))
+    gain[:attack_samples] = np.linspace(0.0, 1.0, attack_samples, endpoint=False)
+    
+    decay_end = min(num_samples, attack_samples + int(envelope.decay * sample_rate))
+    decay_samples = decay_end - attack_samples
+    gain[attack_samples:decay_end] = np.linspace(1.0, envelope.sustain, decay_samples, endpoint=False)
+    
+    return gain
+
+
 def demo_audio_generation():
     """演示音频生成和效果处理"""
     print("\n" + "=" * 60)
@@ -176,8 +226,7 @@ def demo_audio_generation():
     duration = 2.0
     
     # 创建合成器
-    osc = Oscillator(waveform="sawtooth", frequency=440, sample_rate=sample_rate)
-    filter_module = Filter(filter_type="lowpass", cutoff=2000, resonance=0.5, sample_rate=sample_rate)
+    filter_module = Filter(filter_type="lowpass", cutoff=2000, sample_rate=sample_rate)
     envelope = Envelope(attack=0.01, decay=0.3, sustain=0.5, release=0.3, sample_rate=sample_rate)
     
     # 生成音频
@@ -186,18 +235,19 @@ def demo_audio_generation():
     
     # 生成简单的旋律
     notes = [261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 392.00, 349.23, 329.63, 293.66, 261.63]
-    samples = np.zeros(num_samples)
+    samples = _scratch_buffer(num_samples)
     
     note_duration = num_samples // len(notes)
     for i, freq in enumerate(notes):
-        osc.frequency = freq
         start = i * note_duration
         end = min((i + 1) * note_duration, num_samples)
         
-        for j in range(start, end):
-            osc_sample = osc.process()
-            env_sample = envelope.process()
-            samples[j] = osc_sample * env_sample
+        # 整个音符块一次性生成: 锯齿波(波表) × ADSR包络, 直接写入缓冲区
+        block = _render_wavetable(freq, end - start, sample_rate)
+        np.multiply(block, _adsr_block(end - start, envelope), out=samples[start:end])
+    
+    # 只清零音符未覆盖的尾部
+    samples[len(notes) * note_duration:] = 0.0
     
     print(f"   ✅ 生成 {len(samples)} 个样本")
     print(f"   ✅ 峰值: {np.max(np.abs(samples)):.3f}")
@@ -254,8 +304,8 @@ def interactive_demo():
     
     # 创建音频引擎
     sample_rate = 44100
-    osc = Oscillator(waveform="sawtooth", frequency=440, sample_rate=sample_rate)
-    filter_module = Filter(filter_type="lowpass", cutoff=3000, resonance=0.3, sample_rate=sample_rate)
+    osc = Oscillator(wave_type="sawtooth", frequency=440, sample_rate=sample_rate)
+    filter_module = Filter(filter_type="lowpass", cutoff=3000, sample_rate=sample_rate)
     envelope = Envelope(attack=0.01, decay=0.2, sustain=0.7, release=0.2, sample_rate=sample_rate)
     
     # 效果器
@@ -278,24 +328,20 @@ def interactive_demo():
     
     print("\n🎹 开始演奏! 按 'r' 开始/停止录音, 'q' 退出\n")
     
-    while True:
-        try:
-            import tty
-            import termios
-            
-            def get_char():
-                fd = sys.stdin.fileno()
-                old_settings = termios.tcgetattr(fd)
-                try:
-                    tty.setraw(sys.stdin.fileno())
-                    ch = sys.stdin.read(1)
-                finally:
-                    termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-                return ch
-            
-            char = get_char()
+    if not HAS_TTY or not sys.stdin.isatty():
+        print("   (交互模式需要终端支持)")
+        print("\n✅ 交互演示完成！")
+        return
+    
+    # 整个演奏期间只切换一次终端模式 (cbreak: 逐字符读取, 保留输出换行处理)
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    try:
+        while True:
+            char = sys.stdin.read(1)
             
-            if char == 'q':
+            if not char or char == 'q':
                 break
             elif char == 'r':
                 if not recording:
@@ -309,10 +355,10 @@ def interactive_demo():
             elif char.lower() in note_map:
                 note = note_map[char.lower()]
                 if note not in active_notes:
-                    freq = 440 * (2 ** ((note - 69) / 12))
+                    freq = _FREQ_TABLE[note]
                     osc.frequency = freq
                     active_notes[note] = time.time()
-                    envelope.reset()
+                    envelope.trigger()
                     recorder.record_note_on(note, 100)
                     print(f"   🎵 按下: {note} ({freq:.1f} Hz)")
             elif char.lower() in '12345678':
@@ -321,13 +367,10 @@ def interactive_demo():
                 if effect_idx <= len(effects):
                     recorder.state = RecordingState.IDLE
                     pass
-            
-        except ImportError:
-            print("   (交互模式需要终端支持)")
-            break
-        except Exception as e:
-            print(f"   错误: {e}")
-            break
+    except Exception as e:
+        print(f"   错误: {e}")
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     print("\n✅ 交互演示完成！")
 
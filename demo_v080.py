@@ -55,12 +55,12 @@ def demo_generate_test_audio(sample_rate=44100):
     # 生成每个音符
     for freq, start, duration_sec in notes:
         start_sample = int(start * sample_rate)
-        end_sample = int((start + duration_sec) * sample_rate)
+        end_sample = min(int((start + duration_sec) * sample_rate), len(t))
         
-        for i in range(start_sample, min(end_sample, len(t))):
-            current_time = (i - start_sample) / sample_rate
-            envelope = np.exp(-current_time * 3)  # 简单的衰减包络
-            audio_data[i] = np.sin(2 * np.pi * freq * current_time) * 0.3 * envelope
+        # 整段切片一次性计算
+        current_time = np.arange(end_sample - start_sample) / sample_rate
+        envelope = np.exp(-current_time * 3)  # 简单的衰减包络
+        audio_data[start_sample:end_sample] = np.sin(2 * np.pi * freq * current_time) * 0.3 * envelope
     
     print(f"  生成了 {len(audio_data)} 样本 ({duration}秒)")
     print(f"  采样率: {sample_rate} Hz")
@@ -5,13 +5,49 @@
 import pygame
 
 
+# 列表行的显示前缀
+_LINE_PREFIXES = {
+    'bullet': "• ",
+    'subbullet': "  - ",
+}
+
+# 默认字体缓存: 字号 -> Font (避免每次创建对话框都重新加载字体文件)
+_FONT_CACHE = {}
+
+
+def _font(size):
+    """获取指定字号的默认字体 (按字号缓存)"""
+    font = _FONT_CACHE.get(size)
+    if font is None:
+        font = _FONT_CACHE[size] = pygame.font.Font(None, size)
+    return font
+
+
 class HelpSystem:
     """帮助系统"""
     
+    # 页面切换按钮: (页面名, 标签)
+    PAGE_BUTTONS = (
+        ('main', '概览'),
+        ('keyboard', '键盘'),
+        ('modules', '模块'),
+        ('presets', '预设'),
+        ('shortcuts', '快捷键'),
+    )
+    PAGE_BUTTON_WIDTH = 100
+    PAGE_BUTTON_HEIGHT = 30
+    PAGE_BUTTON_GAP = 10
+    PAGE_BUTTON_Y = 60
+    
     def __init__(self, screen_width, screen_height, theme_colors=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         
+        # 按钮布局常量 (只依赖屏幕宽度)
+        count = len(self.PAGE_BUTTONS)
+        self._buttons_total_width = count * self.PAGE_BUTTON_WIDTH + (count - 1) * self.PAGE_BUTTON_GAP
+        self._buttons_start_x = screen_width // 2 - self._buttons_total_width // 2
+        
         # 颜色配置
         if theme_colors:
             self.colors = theme_colors
@@ -27,45 +63,70 @@ class HelpSystem:
             }
         
         # 字体
-        self.title_font = pygame.font.Font(None, 36)
-        self.header_font = pygame.font.Font(None, 26)
-        self.normal_font = pygame.font.Font(None, 20)
-        self.small_font = pygame.font.Font(None, 16)
+        self.title_font = _font(36)
+        self.header_font = _font(26)
+        self.normal_font = _font(20)
+        self.small_font = _font(16)
         
-        # 帮助页面内容
+        # 行样式 -> (字体, 颜色, x偏移, 行高)
+        self._build_style_dispatch()
+        
+        # 帮助页面内容 (列表前缀在此一次性拼好)
         self.pages = {
-            'main': self._get_main_content(),
-            'keyboard': self._get_keyboard_content(),
-            'modules': self._get_modules_content(),
-            'presets': self._get_presets_content(),
-            'shortcuts': self._get_shortcuts_content(),
+            'main': self._materialize(self._get_main_content()),
+            'keyboard': self._materialize(self._get_keyboard_content()),
+            'modules': self._materialize(self._get_modules_content()),
+            'presets': self._materialize(self._get_presets_content()),
+            'shortcuts': self._materialize(self._get_shortcuts_content()),
         }
         
         self.current_page = 'main'
         self.scroll_offset = 0
         self.max_scroll = 0
         
+        # 预渲染的页面内容: 页面名 -> (surface, 内容高度)
+        self._page_cache = {}
+        
+        # 内容是否需要重绘 (页面切换/滚动/主题变化时置位, render后清除)
+        self._dirty = True
+        
         # 页面切换按钮
         self.page_buttons = []
         self._create_page_buttons()
     
     def _create_page_buttons(self):
-        """创建页面切换按钮"""
-        page_names = ['main', 'keyboard', 'modules', 'presets', 'shortcuts']
-        page_labels = ['概览', '键盘', '模块', '预设', '快捷键']
+        """创建页面切换按钮 (位置只依赖屏幕宽度, 创建一次)"""
+        button_width = self.PAGE_BUTTON_WIDTH
+        step = button_width + self.PAGE_BUTTON_GAP
+        start_x = self._buttons_start_x
         
-        button_width = 100
-        button_height = 30
-        button_y = 60
-        start_x = self.screen_width // 2 - (len(page_names) * button_width + (len(page_names) - 1) * 10) // 2
-        
-        for i, (name, label) in enumerate(zip(page_names, page_labels)):
-            rect = pygame.Rect(start_x + i * (button_width + 10), button_y, button_width, button_height)
+        for i, (name, label) in enumerate(self.PAGE_BUTTONS):
+            rect = pygame.Rect(start_x + i * step, self.PAGE_BUTTON_Y, button_width, self.PAGE_BUTTON_HEIGHT)
             self.page_buttons.append({
                 'rect': rect,
                 'page': name,
                 'label': label,
             })
+        self._render_button_labels()
+    
+    def _render_button_labels(self):
+        """预渲染按钮文字 (颜色变化时重新渲染)"""
+        for button in self.page_buttons:
+            label_surf = self.normal_font.render(button['label'], True, self.colors['text_primary'])
+            button['label_surf'] = label_surf
+            button['label_rect'] = label_surf.get_rect(center=button['rect'].center)
+    
+    @staticmethod
+    def _materialize(content):
+        """把每行整理成最终显示的文字: 列表行补上前缀 (已带前缀的不重复添加)"""
+        lines = []
+        for item in content:
+            text, style = item[0], item[1]
+            prefix = _LINE_PREFIXES.get(style)
+            if prefix and not text.startswith(prefix):
+                text = prefix + text
+            lines.append((text, style))
+        return lines
     
     def _get_main_content(self):
         """获取主页面内容"""
@@ -208,21 +269,20 @@ class HelpSystem:
         ]
     
     def handle_event(self, event):
-        """处理事件"""
+        """处理事件
+        
+        返回 'toggle' 表示关闭帮助; 返回 True 表示页面或滚动位置发生了变化
+        """
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # 左键
                 # 检查页面切换按钮
                 for button in self.page_buttons:
                     if button['rect'].collidepoint(event.pos):
-                        self.current_page = button['page']
-                        self.scroll_offset = 0
-                        return True
-        
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 4:  # 滚轮上
-                self.scroll_offset = max(0, self.scroll_offset - 30)
+                        return self._set_page(button['page'])
+            elif event.button == 4:  # 滚轮上
+                return self._set_scroll(self.scroll_offset - 30)
             elif event.button == 5:  # 滚轮下
-                self.scroll_offset = min(self.max_scroll, self.scroll_offset + 30)
+                return self._set_scroll(self.scroll_offset + 30)
         
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_h or event.key == pygame.K_ESCAPE:
@@ -231,17 +291,99 @@ class HelpSystem:
                 # 上一页
                 pages = list(self.pages.keys())
                 idx = pages.index(self.current_page)
-                self.current_page = pages[max(0, idx - 1)]
-                self.scroll_offset = 0
+                return self._set_page(pages[max(0, idx - 1)])
             elif event.key == pygame.K_RIGHT:
                 # 下一页
                 pages = list(self.pages.keys())
                 idx = pages.index(self.current_page)
-                self.current_page = pages[min(len(pages) - 1, idx + 1)]
-                self.scroll_offset = 0
+                return self._set_page(pages[min(len(pages) - 1, idx + 1)])
         
         return False
     
+    def _set_page(self, page_name):
+        """切换页面并回到顶部, 返回是否有变化"""
+        if page_name == self.current_page and self.scroll_offset == 0:
+            return False
+        self.current_page = page_name
+        self.scroll_offset = 0
+        self._dirty = True
+        return True
+    
+    def _set_scroll(self, offset):
+        """设置滚动位置 (限制在有效范围内), 返回是否有变化"""
+        offset = max(0, min(self.max_scroll, offset))
+        if offset == self.scroll_offset:
+            return False
+        self.scroll_offset = offset
+        self._dirty = True
+        return True
+    
+    @property
+    def dirty(self):
+        """自上次render以来是否有需要重绘的变化"""
+        return self._dirty
+    
+    def set_theme_colors(self, theme_colors):
+        """切换主题颜色 (丢弃预渲染的页面)"""
+        self.colors = theme_colors
+        self._build_style_dispatch()
+        self._page_cache.clear()
+        self._render_button_labels()
+        self._dirty = True
+    
+    def _build_style_dispatch(self):
+        """构建行样式表 (字体为None的样式只占位不绘制; 主标题在render中绘制, 不在表中)"""
+        self._style_dispatch = {
+            'spacer': (None, None, 0, 20),
+            'header': (self.header_font, self.colors['text_accent'], 30, 35),
+            'normal': (self.normal_font, self.colors['text_primary'], 30, 28),
+            'accent': (self.normal_font, self.colors['text_accent'], 30, 28),
+            'bullet': (self.normal_font, self.colors['text_secondary'], 30, 28),
+            'subbullet': (self.small_font, self.colors['text_secondary'], 50, 22),
+            'mono': (self.small_font, (150, 255, 200), 30, 24),
+        }
+    
+    def _layout_page(self, page_name):
+        """计算页面每一行的 (文字surface, x偏移, y偏移) 及内容总高度"""
+        items = []
+        content_y = 0
+        dispatch = self._style_dispatch
+        
+        for item in self.pages.get(page_name, []):
+            entry = dispatch.get(item[1])
+            if entry is None:
+                continue
+            
+            font, color, offset_x, line_height = entry
+            if font is not None:
+                items.append((font.render(item[0], True, color), offset_x, content_y))
+            content_y += line_height
+        
+        return items, content_y
+    
+    def _build_page_surface(self, page_name):
+        """把整页文字预渲染到一张透明surface上"""
+        items, content_height = self._layout_page(page_name)
+        
+        width = max((offset_x + surf.get_width() for surf, offset_x, _ in items), default=1)
+        height = max((offset_y + surf.get_height() for surf, _, offset_y in items), default=1)
+        page_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        
+        # 各行互不重叠, 用RGBA_MAX直接拷贝像素和alpha (避免在透明底上二次混合)
+        for surf, offset_x, offset_y in items:
+            page_surf.blit(surf, (offset_x, offset_y), special_flags=pygame.BLEND_RGBA_MAX)
+        
+        # 转成显示格式 (首次访问时显示模式已经设置好)
+        self._page_cache[page_name] = (page_surf.convert_alpha(), content_height)
+        return self._page_cache[page_name]
+    
+    def _get_page_surface(self, page_name):
+        """获取页面的预渲染surface (首次访问时构建)"""
+        cached = self._page_cache.get(page_name)
+        if cached is None:
+            cached = self._build_page_surface(page_name)
+        return cached
+    
     def render(self, surface, x=None, y=None, width=None, height=None):
         """渲染帮助面板"""
         if x is None:
@@ -268,7 +410,8 @@ class HelpSystem:
         }.get(self.current_page, '帮助')
         
         title = self.title_font.render(title_text, True, self.colors['text_primary'])
-        surface.blit(title, (x + 20, y + 20))
+        # 文字和页面统一收集, 最后一次blits绘制 (各部分互不重叠)
+        blits = [(title, (x + 20, y + 20))]
         
         # 绘制页面切换按钮
         for button in self.page_buttons:
@@ -276,58 +419,15 @@ class HelpSystem:
             pygame.draw.rect(surface, color, button['rect'])
             pygame.draw.rect(surface, self.colors['border'], button['rect'], 1)
             
-            label = self.normal_font.render(button['label'], True, self.colors['text_primary'])
-            label_rect = label.get_rect(center=button['rect'].center)
-            surface.blit(label, label_rect)
+            blits.append((button['label_surf'], button['label_rect']))
         
-        # 绘制内容
-        content = self.pages.get(self.current_page, [])
-        content_y = y + 80 - self.scroll_offset
-        
-        for item in content:
-            if len(item) == 2:
-                text, style = item
-            else:
-                text, style = item[0], item[1]
-            
-            if style == 'title':
-                continue  # 主标题已在上面绘制
-            
-            elif style == 'spacer':
-                content_y += 20
-            
-            elif style == 'header':
-                surf = self.header_font.render(text, True, self.colors['text_accent'])
-                surface.blit(surf, (x + 30, content_y))
-                content_y += 35
-            
-            elif style == 'normal':
-                surf = self.normal_font.render(text, True, self.colors['text_primary'])
-                surface.blit(surf, (x + 30, content_y))
-                content_y += 28
-            
-            elif style == 'accent':
-                surf = self.normal_font.render(text, True, self.colors['text_accent'])
-                surface.blit(surf, (x + 30, content_y))
-                content_y += 28
-            
-            elif style == 'bullet':
-                surf = self.normal_font.render(f"• {text}", True, self.colors['text_secondary'])
-                surface.blit(surf, (x + 30, content_y))
-                content_y += 28
-            
-            elif style == 'subbullet':
-                surf = self.small_font.render(f"  - {text}", True, self.colors['text_secondary'])
-                surface.blit(surf, (x + 50, content_y))
-                content_y += 22
-            
-            elif style == 'mono':
-                surf = self.small_font.render(text, True, (150, 255, 200))
-                surface.blit(surf, (x + 30, content_y))
-                content_y += 24
+        # 绘制内容 (整页预渲染, 每帧只需一次blit; 只拷贝可见区域, 滚出面板的部分不绘制)
+        page_surf, content_height = self._get_page_surface(self.current_page)
+        viewport = pygame.Rect(0, self.scroll_offset, width - 20, height - 120)
+        blits.append((page_surf, (x, y + 80), viewport))
         
         # 更新最大滚动距离
-        self.max_scroll = max(0, content_y - (y + height - 40))
+        self.max_scroll = max(0, content_height + 80 - (height - 40))
         
         # 绘制滚动条（如果需要）
         if self.max_scroll > 0:
@@ -342,8 +442,10 @@ class HelpSystem:
         
         # 底部提示
         hint = self.small_font.render("按 ← → 切换页面 | 滚轮滚动 | 按 H 关闭", True, self.colors['text_secondary'])
-        surface.blit(hint, (x + 20, y + height - 25))
+        blits.append((hint, (x + 20, y + height - 25)))
+        surface.blits(blits, doreturn=False)
         
+        self._dirty = False
         return panel_rect
 
 
@@ -368,9 +470,9 @@ class AboutDialog:
             }
         
         # 字体
-        self.title_font = pygame.font.Font(None, 36)
-        self.normal_font = pygame.font.Font(None, 22)
-        self.small_font = pygame.font.Font(None, 16)
+        self.title_font = _font(36)
+        self.normal_font = _font(22)
+        self.small_font = _font(16)
         
         # 窗口尺寸
         self.width = 450
@@ -382,6 +484,10 @@ class AboutDialog:
         self.close_button = pygame.Rect(self.x + self.width - 90, self.y + self.height - 45, 80, 30)
         
         self.visible = False
+        
+        # 背景遮罩和对话框内容都是静态的, 首次渲染时构建后复用
+        self._mask = None
+        self._dialog_surface = None
     
     def show(self):
         """显示对话框"""
@@ -419,25 +525,34 @@ class AboutDialog:
             return
         
         # 背景遮罩
-        mask = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        mask.fill((0, 0, 0, 150))
-        surface.blit(mask, (0, 0))
+        if self._mask is None:
+            self._mask = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA).convert_alpha()
+            self._mask.fill((0, 0, 0, 150))
+        surface.blit(self._mask, (0, 0))
+        
+        # 对话框
+        if self._dialog_surface is None:
+            self._dialog_surface = self._build_dialog_surface()
+        surface.blit(self._dialog_surface, (self.x, self.y))
+    
+    def _build_dialog_surface(self):
+        """把对话框背景、文字和关闭按钮预渲染到一张surface上 (坐标相对对话框左上角)"""
+        dialog = pygame.Surface((self.width, self.height))
         
         # 对话框背景
-        pygame.draw.rect(surface, self.colors['bg'], (self.x, self.y, self.width, self.height))
-        pygame.draw.rect(surface, self.colors['border'], (self.x, self.y, self.width, self.height), 2)
+        pygame.draw.rect(dialog, self.colors['bg'], (0, 0, self.width, self.height))
+        pygame.draw.rect(dialog, self.colors['border'], (0, 0, self.width, self.height), 2)
         
         # 标题
         title = self.title_font.render("🎹 Modular Synth Studio", True, self.colors['text_primary'])
-        surface.blit(title, (self.x + 20, self.y + 20))
+        dialog.blit(title, (20, 20))
         
         # 版本
         version = self.normal_font.render("v1.0.0 - Steam Edition", True, self.colors['accent'])
-        surface.blit(version, (self.x + 20, self.y + 60))
+        dialog.blit(version, (20, 60))
         
         # 分隔线
-        pygame.draw.line(surface, self.colors['border'], (self.x + 20, self.y + 95), 
-                        (self.x + self.width - 20, self.y + 95), 1)
+        pygame.draw.line(dialog, self.colors['border'], (20, 95), (self.width - 20, 95), 1)
         
         # 内容
         lines = [
@@ -453,18 +568,21 @@ class AboutDialog:
             ("按 H 打开帮助文档", self.colors['accent']),
         ]
         
-        y = self.y + 115
+        y = 115
         for text, color in lines:
             surf = self.small_font.render(text, True, color)
-            surface.blit(surf, (self.x + 30, y))
+            dialog.blit(surf, (30, y))
             y += 22
         
         # 关闭按钮
-        pygame.draw.rect(surface, self.colors['panel'], self.close_button)
-        pygame.draw.rect(surface, self.colors['border'], self.close_button, 1)
+        close_button = self.close_button.move(-self.x, -self.y)
+        pygame.draw.rect(dialog, self.colors['panel'], close_button)
+        pygame.draw.rect(dialog, self.colors['border'], close_button, 1)
         close_text = self.normal_font.render("关闭", True, self.colors['text_primary'])
-        close_rect = close_text.get_rect(center=self.close_button.center)
-        surface.blit(close_text, close_rect)
+        close_rect = close_text.get_rect(center=close_button.center)
+        dialog.blit(close_text, close_rect)
+        
+        return dialog.convert()
 
 
 # ============ 演示代码 ============
@@ -478,6 +596,7 @@ if __name__ == '__main__':
     
     running = True
     show_help = True
+    redraw = True
     
     while running:
         for event in pygame.event.get():
@@ -487,13 +606,18 @@ if __name__ == '__main__':
             result = help_system.handle_event(event)
             if result == 'toggle':
                 show_help = not show_help
+                redraw = True
         
-        screen.fill((15, 15, 25))
-        
-        if show_help:
-            help_system.render(screen)
+        # 内容没有变化时跳过整帧绘制
+        if redraw or (show_help and help_system.dirty):
+            screen.fill((15, 15, 25))
+            
+            if show_help:
+                help_system.render(screen)
+            
+            pygame.display.flip()
+            redraw = False
         
-        pygame.display.flip()
         clock.tick(60)
     
     pygame.quit()
@@ -3,8 +3,51 @@
 # Nana的虚拟模块合成器 - 启动加载画面
 
 import pygame
+import asyncio
+import math
 import sys
 import time
+import numpy as np
+
+# 与 main_window 使用同一个 theme_system 模块 (共享文字缓存)
+from theme_system import render_text
+
+# 整数角度 (0-359度) 的三角函数查找表
+_COS_LUT = np.cos(np.radians(np.arange(360))).tolist()
+_SIN_LUT = np.sin(np.radians(np.arange(360))).tolist()
+
+# 指示器相对旋钮的偏移: 原实现在弧度上减90, 折合成角度
+_INDICATOR_OFFSET_DEG = math.degrees(90)
+
+# 波形动画: 三条波形的相位偏移/振幅/垂直偏移/颜色
+_WAVE_INDEX = np.arange(3, dtype=np.float64)
+_WAVE_AMPLITUDES = 20 + _WAVE_INDEX * 10
+_WAVE_OFFSETS = (_WAVE_INDEX - 1) * 20
+_WAVE_COLORS = ((80, 200, 255), (150, 100, 255), (255, 100, 200))
+
+
+class FramePacer:
+    """基于time.perf_counter的帧率控制 (SDL时钟只有约10ms精度, 帧间隔会抖动)"""
+    
+    def __init__(self, fps=60):
+        self.interval = 1 / fps
+        self._next_frame = time.perf_counter()
+    
+    def tick(self):
+        """等到下一帧的时间点: 先sleep到只差约1ms, 剩下的忙等"""
+        self._next_frame += self.interval
+        now = time.perf_counter()
+        delay = self._next_frame - now
+        
+        # 落后超过一帧 (例如窗口被拖动) 时重新对齐, 不连续追帧
+        if delay < -self.interval:
+            self._next_frame = now
+            return
+        
+        if delay > 0.002:
+            time.sleep(delay - 0.001)
+        while time.perf_counter() < self._next_frame:
+            pass
 
 
 class LoadingScreen:
@@ -26,9 +69,10 @@ class LoadingScreen:
         # 字体
         self.title_font = pygame.font.Font(None, 48)
         self.text_font = pygame.font.Font(None, 24)
+        self.task_font = pygame.font.Font(None, 18)
         
         # 动画状态
-        self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(60)
         self.progress = 0
         self.message = "初始化..."
         self.done = False
@@ -39,12 +83,24 @@ class LoadingScreen:
         self.tasks = []
         self.current_task = 0
         
+        # 波形动画的采样位置和与时间无关的相位 (按宽度缓存)
+        self._wave_xs = np.arange(0, dtype=np.float64)
+        self._wave_base = self._wave_xs / 50
+        
+        # 标题和发光底板只创建一次, 每帧只改发光的透明度
+        self._title_surf = render_text(self.title_font, "🎹 Modular Synth Studio", self.text_color)
+        glow_size = (self._title_surf.get_width() + 20, self._title_surf.get_height() + 10)
+        self._glow_surf = pygame.Surface(glow_size, pygame.SRCALPHA).convert_alpha()
+        pygame.draw.rect(self._glow_surf, (100, 200, 255), (0, 0, *glow_size), border_radius=10)
+        
     def add_task(self, task_name):
-        """添加加载任务"""
+        """添加加载任务 (两种状态的文字在这里一次渲染好)"""
         self.tasks.append({
             'name': task_name,
             'completed': False,
-            'start_time': None
+            'start_time': None,
+            'surf_pending': render_text(self.task_font, f"○ {task_name}", (150, 150, 180)),
+            'surf_done': render_text(self.task_font, f"✓ {task_name}", (100, 255, 100)),
         })
     
     def set_progress(self, progress, message=""):
@@ -96,41 +152,38 @@ class LoadingScreen:
         # 多个旋钮旋转动画
         for i in range(4):
             angle = time_val * 2 + i * (360 // 4)
-            angle_rad = pygame.math.radians(angle)
+            a = int(angle) % 360
             
             radius = 35
-            knob_x = center_x + 60 * pygame.math.cos(angle_rad)
-            knob_y = center_y + 60 * pygame.math.sin(angle_rad)
+            knob_x = center_x + 60 * _COS_LUT[a]
+            knob_y = center_y + 60 * _SIN_LUT[a]
             
             # 旋钮主体
             pygame.draw.circle(self.screen, (60, 60, 90), (int(knob_x), int(knob_y)), 20)
             pygame.draw.circle(self.screen, self.accent_color, (int(knob_x), int(knob_y)), 20, 2)
             
             # 指示器
-            indicator_x = knob_x + 12 * pygame.math.cos(angle_rad - 90)
-            indicator_y = knob_y + 12 * pygame.math.sin(angle_rad - 90)
+            b = int(angle - _INDICATOR_OFFSET_DEG) % 360
+            indicator_x = knob_x + 12 * _COS_LUT[b]
+            indicator_y = knob_y + 12 * _SIN_LUT[b]
             pygame.draw.circle(self.screen, self.accent_color, (int(indicator_x), int(indicator_y)), 4)
     
     def _draw_waveform_animation(self, x, y, width, height, time_val):
         """绘制波形动画"""
         center_y = y + height // 2
         
+        if len(self._wave_xs) != width:
+            self._wave_xs = np.arange(width, dtype=np.float64)
+            self._wave_base = self._wave_xs / 50
+        screen_xs = self._wave_xs + x
+        
+        # 三条波形的相位组成 (3, width) 矩阵, 一次np.sin算完
+        phases = (self._wave_base + time_val * 3)[None, :] + _WAVE_INDEX[:, None]
+        ys = center_y + np.sin(phases) * _WAVE_AMPLITUDES[:, None] + _WAVE_OFFSETS[:, None]
+        
         # 绘制多条波形
-        for wave_idx in range(3):
-            offset_y = (wave_idx - 1) * 20
-            amplitude = 20 + wave_idx * 10
-            color = [
-                (80, 200, 255),
-                (150, 100, 255),
-                (255, 100, 200)
-            ][wave_idx]
-            
-            points = []
-            for i in range(width):
-                t = i / 50 + time_val * 3 + wave_idx
-                y_offset = pygame.math.sin(t) * amplitude
-                points.append((x + i, center_y + y_offset + offset_y))
-            
+        for wave_idx, color in enumerate(_WAVE_COLORS):
+            points = np.column_stack((screen_xs, ys[wave_idx])).tolist()
             pygame.draw.lines(self.screen, color, False, points, 2)
     
     def render(self):
@@ -152,21 +205,18 @@ class LoadingScreen:
         self.screen.fill(self.bg_color)
         
         # 标题
-        title = self.title_font.render("🎹 Modular Synth Studio", True, self.text_color)
+        title = self._title_surf
         title_rect = title.get_rect(center=(self.width // 2, 100))
         
         # 标题发光效果
-        glow_surf = pygame.Surface((title.get_width() + 20, title.get_height() + 10), pygame.SRCALPHA)
-        glow_color = (100, 200, 255, 50 + int(pygame.math.sin(self.pulse_phase) * 20))
-        pygame.draw.rect(glow_surf, glow_color, (0, 0, title.get_width() + 20, title.get_height() + 10), 
-                        border_radius=10)
-        self.screen.blit(glow_surf, (title_rect.x - 10, title_rect.y - 5))
-        self.screen.blit(title, title_rect)
+        self._glow_surf.set_alpha(50 + int(math.sin(self.pulse_phase) * 20))
+        # 文字统一收集, 最后一次blits绘制
+        blits = [(self._glow_surf, (title_rect.x - 10, title_rect.y - 5)), (title, title_rect)]
         
         # 副标题
-        subtitle = self.text_font.render("Nana's Virtual Modular Synthesizer", True, (150, 150, 180))
+        subtitle = render_text(self.text_font, "Nana's Virtual Modular Synthesizer", (150, 150, 180))
         subtitle_rect = subtitle.get_rect(center=(self.width // 2, 150))
-        self.screen.blit(subtitle, subtitle_rect)
+        blits.append((subtitle, subtitle_rect))
         
         # 绘制旋钮动画
         self._draw_knob_animation(self.width // 2, 280, self.pulse_phase)
@@ -184,38 +234,34 @@ class LoadingScreen:
         
         # 进度百分比
         percent_text = f"{int(self.progress * 100)}%"
-        percent_surf = self.text_font.render(percent_text, True, self.text_color)
+        percent_surf = render_text(self.text_font, percent_text, self.text_color)
         percent_rect = percent_surf.get_rect(center=(self.width // 2, bar_y - 25))
-        self.screen.blit(percent_surf, percent_rect)
+        blits.append((percent_surf, percent_rect))
         
         # 状态消息
-        message_surf = self.text_font.render(self.message, True, self.accent_color)
+        message_surf = render_text(self.text_font, self.message, self.accent_color)
         message_rect = message_surf.get_rect(center=(self.width // 2, bar_y + 45))
-        self.screen.blit(message_surf, message_rect)
+        blits.append((message_surf, message_rect))
         
         # 任务列表
         if self.tasks:
             task_y = 560
-            task_font = pygame.font.Font(None, 18)
             
-            for i, task in enumerate(self.tasks):
-                if i >= 5:  # 只显示前5个
-                    break
-                    
-                task_text = f"{'✓' if task['completed'] else '○'} {task['name']}"
-                task_color = (100, 255, 100) if task['completed'] else (150, 150, 180)
-                task_surf = task_font.render(task_text, True, task_color)
-                self.screen.blit(task_surf, (self.width // 2 - 150, task_y + i * 22))
+            # 只显示前5个
+            for i, task in enumerate(self.tasks[:5]):
+                task_surf = task['surf_done'] if task['completed'] else task['surf_pending']
+                blits.append((task_surf, (self.width // 2 - 150, task_y + i * 22)))
         
         # 版本信息
         version_text = "v1.0.0 - Steam Edition"
-        version_surf = self.text_font.render(version_text, True, (100, 100, 130))
+        version_surf = render_text(self.text_font, version_text, (100, 100, 130))
         version_rect = version_surf.get_rect(center=(self.width // 2, self.height - 40))
-        self.screen.blit(version_surf, version_rect)
+        blits.append((version_surf, version_rect))
+        self.screen.blits(blits, doreturn=False)
         
         # 更新显示
         pygame.display.flip()
-        self.clock.tick(60)
+        self.pacer.tick()
         
         return not self.done
     
@@ -227,6 +273,23 @@ class LoadingScreen:
                 pygame.time.wait(500)  # 完成后再显示一会儿
                 break
         return self.done
+    
+    async def run_async(self, loader):
+        """与加载协程并发运行加载画面
+        
+        loader(self) 是负责实际加载的协程, 其中耗时的同步步骤应通过
+        asyncio.to_thread 放到线程里执行, 这样画面在加载期间持续刷新。
+        """
+        task = asyncio.create_task(loader(self))
+        while not task.done():
+            self.render()
+            await asyncio.sleep(0)  # render内部已按60FPS限速, 这里只让出给加载协程
+        await task  # 加载中的异常在这里抛出
+        
+        if self.done:
+            self.render()
+            await asyncio.sleep(0.5)  # 完成后再显示一会儿
+        return self.done
 
 
 class SplashScreen:
@@ -250,6 +313,12 @@ class SplashScreen:
         self.title_font = pygame.font.Font(None, 72)
         self.subtitle_font = pygame.font.Font(None, 28)
         
+        self.pacer = FramePacer(60)
+        
+        # 标题/副标题只渲染一次, 每帧只改透明度
+        self.title_surf = self.title_font.render("🎹 Modular Synth Studio", True, self.text_color).convert_alpha()
+        self.subtitle_surf = self.subtitle_font.render("Nana's Virtual Modular Synthesizer", True, self.accent_color).convert_alpha()
+        
         self.pulse_phase = 0
         
     def render(self):
@@ -268,26 +337,19 @@ class SplashScreen:
         
         # 脉冲效果
         self.pulse_phase += 0.05
-        pulse = 0.8 + pygame.math.sin(self.pulse_phase) * 0.2
+        pulse = 0.8 + math.sin(self.pulse_phase) * 0.2
         
         # 标题
-        title = self.title_font.render("🎹 Modular Synth Studio", True, self.text_color)
         title_alpha = int(255 * min(progress * 2, 1.0))
-        
-        # 创建带透明度标题
-        title_surf = pygame.Surface(title.get_size(), pygame.SRCALPHA)
-        title_surf.blit(title, (0, 0))
+        title_surf = self.title_surf
         title_surf.set_alpha(title_alpha)
         
         title_rect = title_surf.get_rect(center=(self.width // 2, self.height // 2 - 50))
         self.screen.blit(title_surf, title_rect)
         
         # 副标题
-        subtitle = self.subtitle_font.render("Nana's Virtual Modular Synthesizer", True, self.accent_color)
         subtitle_alpha = int(255 * min((progress - 0.3) * 2, 1.0))
-        
-        subtitle_surf = pygame.Surface(subtitle.get_size(), pygame.SRCALPHA)
-        subtitle_surf.blit(subtitle, (0, 0))
+        subtitle_surf = self.subtitle_surf
         subtitle_surf.set_alpha(subtitle_alpha)
         
         subtitle_rect = subtitle_surf.get_rect(center=(self.width // 2, self.height // 2 + 20))
@@ -295,14 +357,14 @@ class SplashScreen:
         
         # 简单的脉冲圆圈
         if progress > 0.5:
-            circle_radius = 30 + pygame.math.sin(self.pulse_phase * 2) * 5
+            circle_radius = 30 + math.sin(self.pulse_phase * 2) * 5
             circle_alpha = int(200 * (1 - (progress - 0.5) * 2))
             
             pygame.draw.circle(self.screen, (*self.accent_color, circle_alpha), 
                              (self.width // 2, self.height // 2 + 100), int(circle_radius), 3)
         
         pygame.display.flip()
-        self.clock.tick(60)
+        self.pacer.tick()
         
         return progress < 1.0
     
@@ -314,6 +376,14 @@ class SplashScreen:
 
 
 # ============ 演示代码 ============
+async def _demo_loader(loading):
+    """模拟加载过程: 每个耗时步骤在线程中执行, 不阻塞画面"""
+    for _ in loading.tasks:
+        await asyncio.to_thread(time.sleep, 0.5)
+        loading.next_task()
+    loading.complete_all()
+
+
 if __name__ == '__main__':
     # 创建加载画面
     loading = LoadingScreen()
@@ -327,10 +397,7 @@ if __name__ == '__main__':
     loading.add_task("加载预设音色...")
     
     # 模拟加载过程
-    for i in range(len(loading.tasks) + 1):
-        loading.render()
-        pygame.time.wait(500)
-        loading.next_task()
+    asyncio.run(loading.run_async(_demo_loader))
     
     print("✅ 加载动画演示完成！")
     pygame.quit()
@@ -6,13 +6,14 @@ import pygame
 import json
 import os
 import sys
+import numpy as np
 
 # 添加gui目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from audio.core_modules import Oscillator, Filter, Envelope, LFO, MultiOscillator
-from theme_system import ThemeManager, LayoutConfig
-from loading_screen import LoadingScreen
+from audio.core_modules import Oscillator, Filter, Envelope, LFO, MultiOscillator, njit, HAS_NUMBA
+from theme_system import ThemeManager, LayoutConfig, render_text
+from loading_screen import LoadingScreen, FramePacer
 from help_system import HelpSystem, AboutDialog
 
 # 尝试导入实时音频模块
@@ -23,6 +24,12 @@ except ImportError:
     HAS_REALTIME_AUDIO = False
     print("⚠️ 实时音频模块不可用 (sounddevice未安装)")
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # 使用主题系统
 THEME = ThemeManager('DARK')
 LAYOUT = LayoutConfig()
@@ -43,6 +50,49 @@ SCREEN_HEIGHT = LAYOUT.SCREEN_HEIGHT
 MODULE_WIDTH = LAYOUT.MODULE_WIDTH
 MODULE_HEIGHT = LAYOUT.MODULE_HEIGHT
 
+# 变化区域超过屏幕面积的这个比例时, 直接整屏flip
+DIRTY_AREA_LIMIT = 0.25
+
+# 波形预览的刷新间隔 (毫秒, 约15Hz); 绘制仍按60FPS进行
+AUDIO_UPDATE_INTERVAL_MS = 66
+
+# 状态栏文字缓存的最大条数 (超过后整体清空)
+STATUS_CACHE_SIZE = 256
+
+# MSYNTH_VSYNC=1 时主循环改用垂直同步控制帧率 (需要SCALED窗口, 高分屏上窗口会按整数倍放大)
+VSYNC = os.environ.get('MSYNTH_VSYNC') == '1'
+
+# 旋钮指示器角度查找表: 下标i对应 i - 135 度 (-135 到 135, 每度一项)
+_KNOB_ANGLES = np.radians(np.arange(-135, 136))
+_KNOB_COS_LUT = np.cos(_KNOB_ANGLES).tolist()
+_KNOB_SIN_LUT = np.sin(_KNOB_ANGLES).tolist()
+
+
+@njit(cache=True)
+def _build_points_kernel(wave, x0, width, y0, scale):
+    """_build_points的编译版本: 单个样本循环"""
+    n = len(wave)
+    points = np.empty((n, 2))
+    for i in range(n):
+        points[i, 0] = x0 + i * width // n
+        points[i, 1] = y0 + wave[i] * scale
+    return points
+
+
+def _build_points(wave, x0, width, y0, scale):
+    """把波形样本展开成折线坐标: 第i个点为 (x0 + i*width//n, y0 + wave[i]*scale)"""
+    if HAS_NUMBA:
+        return _build_points_kernel(wave, x0, width, y0, scale)
+    
+    # 纯NumPy: 整段广播计算 (避免未编译的逐样本Python循环)
+    n = len(wave)
+    points = np.empty((n, 2))
+    points[:, 0] = x0 + np.arange(n) * width // n
+    points[:, 1] = wave
+    points[:, 1] *= scale
+    points[:, 1] += y0
+    return points
+
 # ============ 旋钮控件 ============
 class Knob:
     """旋钮控件"""
@@ -57,27 +107,48 @@ class Knob:
         self.dragging = False
         self.drag_start_y = 0
         self.drag_start_value = 0
+        # 指示器端点只在数值变化时重新计算, 数值文字只在显示的字符串变化时重新渲染
+        self._cached_value = None
+        self._knob_endpoint = None
+        self._value_text = None
+        self._cached_value_surf = None
     
-    def draw(self, surface, font):
+    def draw_static(self, surface, font, out_blits):
+        """绘制不随数值变化的部分 (标签和旋钮底座), 用于预渲染背景"""
         # 绘制标签
-        label_surf = font.render(self.label, True, COLOR_TEXT)
-        surface.blit(label_surf, (self.rect.x + 25 - label_surf.get_width()//2, self.rect.y - 20))
+        label_surf = render_text(font, self.label, COLOR_TEXT)
+        out_blits.append((label_surf, (self.rect.x + 25 - label_surf.get_width()//2, self.rect.y - 20)))
         
         # 绘制旋钮背景
         pygame.draw.circle(surface, COLOR_MODULE, self.rect.center, 25)
         pygame.draw.circle(surface, COLOR_MODULE_BORDER, self.rect.center, 25, 2)
+    
+    def draw(self, surface, font, out_blits=None):
+        """绘制指示器和数值 (底座已在背景中); 传入out_blits时文字只加入列表, 由调用方统一blits"""
+        blits = [] if out_blits is None else out_blits
+        
+        if self.value != self._cached_value:
+            self._cached_value = self.value
+            # 数值超出范围时 (例如程序直接赋值) 停在刻度两端, 不越界取表
+            idx = min(max(round((self.value - self.min_val) / (self.max_val - self.min_val) * 270), 0), 270)
+            self._knob_endpoint = (self.rect.centerx + 20 * _KNOB_COS_LUT[idx],
+                                   self.rect.centery + 20 * _KNOB_SIN_LUT[idx])
+            
+            # 拖动时数值连续变化, 但保留两位小数后的文字往往不变
+            value_text = f"{self.value:.2f}"
+            if value_text != self._value_text:
+                self._value_text = value_text
+                self._cached_value_surf = font.render(value_text, True, COLOR_TEXT)
         
         # 绘制旋钮位置
-        angle = (self.value - self.min_val) / (self.max_val - self.min_val) * 270 - 135
-        angle_rad = np.radians(angle)
-        knob_x = self.rect.centerx + 20 * np.cos(angle_rad)
-        knob_y = self.rect.centery + 20 * np.sin(angle_rad)
-        pygame.draw.line(surface, COLOR_KNOB, self.rect.center, (knob_x, knob_y), 3)
+        pygame.draw.line(surface, COLOR_KNOB, self.rect.center, self._knob_endpoint, 3)
         
         # 绘制值
-        value_str = f"{self.value:.2f}"
-        value_surf = font.render(value_str, True, COLOR_TEXT)
-        surface.blit(value_surf, (self.rect.x + 25 - value_surf.get_width()//2, self.rect.y + 30))
+        value_surf = self._cached_value_surf
+        blits.append((value_surf, (self.rect.x + 25 - value_surf.get_width()//2, self.rect.y + 30)))
+        
+        if out_blits is None:
+            surface.blits(blits, doreturn=False)
     
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -114,23 +185,38 @@ class SynthModule:
         self.title = title
         self.knobs = []
     
-    def draw(self, surface, font):
+    def draw_static(self, surface, font, out_blits):
+        """绘制模块中不会变化的部分 (背景/标题/分割线/旋钮底座), 用于预渲染背景"""
         # 绘制模块背景
         pygame.draw.rect(surface, COLOR_MODULE, self.rect)
         pygame.draw.rect(surface, COLOR_MODULE_BORDER, self.rect, 2)
         
         # 绘制标题
-        title_surf = font.render(self.title, True, COLOR_TEXT)
-        surface.blit(title_surf, (self.rect.x + 10, self.rect.y + 10))
+        title_surf = render_text(font, self.title, COLOR_TEXT)
+        out_blits.append((title_surf, (self.rect.x + 10, self.rect.y + 10)))
         
         # 绘制分割线
         pygame.draw.line(surface, COLOR_MODULE_BORDER, 
                         (self.rect.x, self.rect.y + 35), 
                         (self.rect.right, self.rect.y + 35), 2)
         
+        for knob in self.knobs:
+            knob.draw_static(surface, font, out_blits)
+    
+    def draw(self, surface, font, out_blits=None):
+        """绘制模块的动态部分 (静态部分由draw_static预渲染); 传入out_blits时文字只加入列表, 由调用方统一blits"""
+        blits = [] if out_blits is None else out_blits
+        
         # 绘制所有旋钮
         for knob in self.knobs:
-            knob.draw(surface, font)
+            knob.draw(surface, font, blits)
+        
+        if out_blits is None:
+            surface.blits(blits, doreturn=False)
+    
+    def state_key(self):
+        """决定模块外观的状态 (不变时模块区域无需更新到屏幕)"""
+        return tuple(knob.value for knob in self.knobs)
     
     def handle_event(self, event):
         for knob in self.knobs:
@@ -156,26 +242,44 @@ class OscillatorModule(SynthModule):
         # 波形选择（简化为两个位置）
         self.wave_index = 0
         self.wave_types = ['sine', 'sawtooth']
+        
+        # 预览波形的折线点, 只在频率/波形变化时重新生成
+        self._preview_key = None
+        self._preview_points = None
     
-    def draw(self, surface, font):
-        super().draw(surface, font)
+    def _update_preview(self):
+        """振荡器参数变化时重新生成预览折线"""
+        key = (self.osc.frequency, self.osc.wave_type)
+        if key == self._preview_key:
+            return
+        self._preview_key = key
         
-        # 绘制波形预览
         wave_preview = self.osc.generate(duration=0.05)
-        wave_preview = wave_preview * 20 + self.rect.centery + 80
         
-        # 绘制波形线
-        points = []
-        for i, y in enumerate(wave_preview):
-            x = self.rect.x + 20 + i * (MODULE_WIDTH - 40) // len(wave_preview)
-            points.append((x, y))
+        if len(wave_preview) > 1:
+            points = _build_points(wave_preview, self.rect.x + 20, MODULE_WIDTH - 40, self.rect.centery + 80, 20.0)
+            self._preview_points = points.tolist()
+        else:
+            self._preview_points = None
+    
+    def state_key(self):
+        return super().state_key() + (self.osc.frequency, self.osc.wave_type)
+    
+    def draw(self, surface, font, out_blits=None):
+        blits = [] if out_blits is None else out_blits
+        super().draw(surface, font, blits)
         
-        if len(points) > 1:
-            pygame.draw.lines(surface, COLOR_WAVEFORM, False, points, 2)
+        # 绘制波形预览
+        self._update_preview()
+        if self._preview_points:
+            pygame.draw.lines(surface, COLOR_WAVEFORM, False, self._preview_points, 2)
         
         # 绘制波形类型标签
-        wave_label = font.render(f"Wave: {self.osc.wave_type}", True, COLOR_TEXT)
-        surface.blit(wave_label, (self.rect.x + 10, self.rect.y + 300))
+        wave_label = render_text(font, f"Wave: {self.osc.wave_type}", COLOR_TEXT)
+        blits.append((wave_label, (self.rect.x + 10, self.rect.y + 300)))
+        
+        if out_blits is None:
+            surface.blits(blits, doreturn=False)
 
 
 # ============ 滤波器模块 ============
@@ -192,18 +296,28 @@ class FilterModule(SynthModule):
                           lambda v: self.filter.set_cutoff(v))
         self.knobs.append(cutoff_knob)
     
-    def draw(self, surface, font):
-        super().draw(surface, font)
-        
-        # 绘制滤波器类型标签
-        type_label = font.render(f"Type: {self.filter.filter_type}", True, COLOR_TEXT)
-        surface.blit(type_label, (self.rect.x + 10, self.rect.y + 300))
+    def draw_static(self, surface, font, out_blits):
+        super().draw_static(surface, font, out_blits)
         
         # 绘制响应曲线（简化）
         center_y = self.rect.centery + 120
         pygame.draw.line(surface, COLOR_WAVEFORM, 
                         (self.rect.x + 20, center_y + 50),
                         (self.rect.right - 20, center_y - 50), 2)
+    
+    def state_key(self):
+        return super().state_key() + (self.filter.filter_type,)
+    
+    def draw(self, surface, font, out_blits=None):
+        blits = [] if out_blits is None else out_blits
+        super().draw(surface, font, blits)
+        
+        # 绘制滤波器类型标签
+        type_label = render_text(font, f"Type: {self.filter.filter_type}", COLOR_TEXT)
+        blits.append((type_label, (self.rect.x + 10, self.rect.y + 300)))
+        
+        if out_blits is None:
+            surface.blits(blits, doreturn=False)
 
 
 # ============ 包络模块 ============
@@ -217,26 +331,38 @@ class EnvelopeModule(SynthModule):
         
         # Attack
         attack_knob = Knob(x + 20, y + 60, "A", 0.001, 1.0, 0.1,
-                          lambda v: setattr(self.env, 'attack', v))
+                          self._set_attack)
         self.knobs.append(attack_knob)
         
         # Decay
         decay_knob = Knob(x + 65, y + 60, "D", 0.01, 1.0, 0.2,
-                         lambda v: setattr(self.env, 'decay', v))
+                         self._set_decay)
         self.knobs.append(decay_knob)
         
         # Sustain
         sustain_knob = Knob(x + 110, y + 60, "S", 0.0, 1.0, 0.7,
-                           lambda v: setattr(self.env, 'sustain', v))
+                           self._set_sustain)
         self.knobs.append(sustain_knob)
         
         # Release
         release_knob = Knob(x + 65, y + 150, "R", 0.01, 2.0, 0.3,
-                           lambda v: setattr(self.env, 'release', v))
+                           self._set_release)
         self.knobs.append(release_knob)
     
-    def draw(self, surface, font):
-        super().draw(surface, font)
+    def _set_attack(self, v):
+        self.env.attack = v
+    
+    def _set_decay(self, v):
+        self.env.decay = v
+    
+    def _set_sustain(self, v):
+        self.env.sustain = v
+    
+    def _set_release(self, v):
+        self.env.release = v
+    
+    def draw_static(self, surface, font, out_blits):
+        super().draw_static(surface, font, out_blits)
         
         # 绘制ADSR曲线（简化）
         center_y = self.rect.centery + 100
@@ -266,22 +392,34 @@ class LFOModule(SynthModule):
         freq_knob = Knob(x + 20, y + 60, "Freq", 0.1, 20, 2,
                         lambda v: self.lfo.set_frequency(v))
         self.knobs.append(freq_knob)
+        
+        # LFO波形的折线点, 只在频率/波形变化时重新生成
+        self._preview_key = None
+        self._preview_points = None
     
-    def draw(self, surface, font):
-        super().draw(surface, font)
+    def _update_preview(self):
+        """LFO参数变化时重新生成波形折线"""
+        key = (self.lfo.frequency, self.lfo.wave_type)
+        if key == self._preview_key:
+            return
+        self._preview_key = key
         
-        # 绘制LFO波形
         wave = self.lfo.generate(duration=0.5)
-        wave = wave * 30 + self.rect.centery + 50
+        points = _build_points(wave, self.rect.x + 20, MODULE_WIDTH - 40, self.rect.centery + 50, 30.0)
+        points = points[points[:, 0] <= self.rect.right - 20]
         
-        points = []
-        for i, y in enumerate(wave):
-            x = self.rect.x + 20 + i * (MODULE_WIDTH - 40) // len(wave)
-            if x <= self.rect.right - 20:
-                points.append((x, y))
+        self._preview_points = points.tolist() if len(points) > 1 else None
+    
+    def state_key(self):
+        return super().state_key() + (self.lfo.frequency, self.lfo.wave_type)
+    
+    def draw(self, surface, font, out_blits=None):
+        super().draw(surface, font, out_blits)
         
-        if len(points) > 1:
-            pygame.draw.lines(surface, COLOR_WAVEFORM, False, points, 2)
+        # 绘制LFO波形
+        self._update_preview()
+        if self._preview_points:
+            pygame.draw.lines(surface, COLOR_WAVEFORM, False, self._preview_points, 2)
 
 
 # ============ 波形显示器 ============
@@ -296,35 +434,43 @@ class WaveformDisplay:
         """设置音频数据"""
         self.audio_data = audio
     
-    def draw(self, surface, font):
+    def draw_static(self, surface, font, out_blits):
+        """绘制背景/边框/中心线, 用于预渲染背景"""
         # 绘制背景
         pygame.draw.rect(surface, (20, 20, 30), self.rect)
         pygame.draw.rect(surface, COLOR_MODULE_BORDER, self.rect, 2)
         
-        # 标题
-        title = font.render("OUTPUT WAVEFORM", True, COLOR_TEXT)
-        surface.blit(title, (self.rect.x + 10, self.rect.y + 10))
-        
         # 绘制中心线
         center_y = self.rect.centery
         pygame.draw.line(surface, (50, 50, 60), 
                         (self.rect.x, center_y),
                         (self.rect.right, center_y), 1)
+    
+    def draw(self, surface, font, out_blits=None):
+        """绘制波形和标题 (背景由draw_static预渲染); 传入out_blits时标题只加入列表, 由调用方统一blits"""
+        # 完全在裁剪区域之外时什么都不画
+        if not self.rect.colliderect(surface.get_clip()):
+            return
+        
+        # 标题 (波形振幅过大时会越过标题, 所以标题每帧画在波形之上)
+        blits = [] if out_blits is None else out_blits
+        title = render_text(font, "OUTPUT WAVEFORM", COLOR_TEXT)
+        blits.append((title, (self.rect.x + 10, self.rect.y + 10)))
+        
+        center_y = self.rect.centery
         
         # 绘制波形
         if self.audio_data is not None:
-            # 缩放到显示区域
+            # 缩放到显示区域 (只取可见宽度内的样本, 整段向量化计算)
             display_data = self.audio_data[:self.rect.width - 40]
-            display_data = display_data * (self.rect.height - 60) / 2
+            n = len(display_data)
             
-            points = []
-            for i, sample in enumerate(display_data):
-                x = self.rect.x + 20 + i
-                y = center_y - sample
-                points.append((x, y))
-            
-            if len(points) > 1:
-                pygame.draw.lines(surface, COLOR_WAVEFORM, False, points, 2)
+            if n > 1:
+                points = _build_points(display_data, self.rect.x + 20, n, center_y, -(self.rect.height - 60) / 2)
+                pygame.draw.lines(surface, COLOR_WAVEFORM, False, points.tolist(), 2)
+        
+        if out_blits is None:
+            surface.blits(blits, doreturn=False)
 
 
 # ============ 主界面 ============
@@ -336,7 +482,10 @@ class SynthGUI:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("🎹 Modular Synth Studio - Nana's Project")
         
-        self.clock = pygame.time.Clock()
+        self.clock = pygame.time.Clock()  # 只用于统计FPS
+        self.pacer = FramePacer(60)
+        self._vsync = False  # 开启垂直同步后由每帧的flip/update控制帧率, 不再使用pacer
+        # 字体只在这里创建一次; 绘制路径中不要再新建Font (每次都要重新加载字体文件)
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
         
@@ -365,13 +514,48 @@ class SynthGUI:
         self.env_module = EnvelopeModule(470, 100)
         self.lfo_module = LFOModule(680, 100)
         
+        # 预热滤波器和折线坐标的numba内核: 编译/加载缓存发生在加载画面期间, 而不是第一帧
+        self.filter_module.filter.process(self.osc_module.osc.generate(0.001))
+        self.osc_module._update_preview()
+        self.lfo_module._update_preview()
+        
         # 创建波形显示
         self.waveform = WaveformDisplay(50, 550, 1100, 150)
         
+        # 鼠标事件分发: 模块等间距横向排列, 按x坐标直接算出所在模块; 拖动中的旋钮直接接收事件
+        self._modules = [self.osc_module, self.filter_module, self.env_module, self.lfo_module]
+        self._module_stride = self.filter_module.rect.x - self.osc_module.rect.x
+        self._dragging_knob = None
+        
         # 状态变量
         self.running = True
         self.audio_buffer = None
         self.loading_complete = False
+        self._audio_key = None  # 上次生成波形时的振荡器/滤波器参数
+        self._audio_version = 0  # 每次重新生成波形时递增 (缓冲区复用, 不能用对象身份判断变化)
+        self._last_audio_update = None  # 上次刷新波形预览的时间 (毫秒)
+        
+        # 状态栏文字几乎每帧都变 (FPS), 但稳定运行时只在少数几个值之间来回,
+        # 用单独的缓存保存渲染结果, 不占用共享文字缓存
+        self._status_text = None
+        self._status_surf = None
+        self._status_surfs = {}
+        
+        # 预览音频的缓冲区只分配一次, 每次生成直接写入
+        preview_samples = int(0.05 * self.osc_module.osc.sample_rate)
+        self._preview_buf = np.empty(preview_samples)
+        self._filtered_buf = np.empty(preview_samples)
+        
+        # 局部更新: 区域 -> 上一帧的状态, 状态变化的区域才更新到屏幕
+        self._region_keys = {}
+        self._full_redraw = True
+        self._status_rect = pygame.Rect(0, SCREEN_HEIGHT - 25, SCREEN_WIDTH, self.small_font.get_linesize())
+        self._message_rect = pygame.Rect(0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, self.font.get_linesize())
+        
+        # 静态背景只渲染一次, 每帧整张blit
+        # (convert()要在set_mode之后调用, 转成显示格式后blit走同格式的快速路径)
+        self._bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self._draw_static(self._bg)
         
         # 键盘音阶（简单版）
         self.key_notes = {
@@ -385,7 +569,26 @@ class SynthGUI:
             pygame.K_k: 523.25,  # C5
         }
         
+        # 快捷键查找表 (按键 -> 参数)
+        self._wave_keys = {
+            pygame.K_1: 'sine',
+            pygame.K_2: 'sawtooth',
+            pygame.K_3: 'square',
+            pygame.K_4: 'triangle',
+        }
+        self._volume_keys = {
+            pygame.K_EQUALS: 0.1,
+            pygame.K_PLUS: 0.1,
+            pygame.K_MINUS: -0.1,
+        }
+        self._preset_keys = {
+            pygame.K_5: 'Lead',
+            pygame.K_6: 'Bass',
+            pygame.K_7: 'Pad',
+        }
+        
         self.active_keys = set()
+        self._active_keys_text = "Active Keys: 0"  # 状态栏按键文字, 只在按键按下/释放时重建
 
         # 实时音频播放器
         if HAS_REALTIME_AUDIO:
@@ -399,6 +602,7 @@ class SynthGUI:
         # 预设音色库
         self.presets_dir = os.path.join(os.path.dirname(__file__), 'presets')
         os.makedirs(self.presets_dir, exist_ok=True)
+        self._presets_dir_mtime = None
         self.load_presets_list()
 
         # 当前预设名称
@@ -420,6 +624,9 @@ class SynthGUI:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # 窗口被遮挡/恢复后屏幕内容已失效, 下一帧整屏flip
+                self._full_redraw = True
             
             # 帮助系统事件
             if self.show_help:
@@ -455,45 +662,28 @@ class SynthGUI:
                     freq = self.key_notes[event.key]
                     self.osc_module.osc.set_frequency(freq)
                     self.active_keys.add(event.key)
+                    self._refresh_active_keys_text()
 
-                    # 实时音频播放
+                    # 实时音频播放 (投递给音频线程, 不阻塞事件循环)
                     if self.synth:
-                        self.synth.note_on(chr(event.key))
-                        self.synth.set_wave_type(self.osc_module.osc.wave_type)
+                        self.synth.send('note_on', chr(event.key))
+                        self.synth.send('set_wave_type', self.osc_module.osc.wave_type)
 
                 # 音量控制
-                elif event.key == pygame.K_EQUAL or event.key == pygame.K_PLUS:
-                    if self.synth:
-                        self.synth.set_volume(self.synth.volume + 0.1)
-                elif event.key == pygame.K_MINUS:
+                elif event.key in self._volume_keys:
                     if self.synth:
-                        self.synth.set_volume(self.synth.volume - 0.1)
+                        self.synth.send('adjust_volume', self._volume_keys[event.key])
 
                 # 波形切换
-                elif event.key == pygame.K_1:
-                    self.osc_module.osc.set_wave_type('sine')
-                    if self.synth:
-                        self.synth.set_wave_type('sine')
-                elif event.key == pygame.K_2:
-                    self.osc_module.osc.set_wave_type('sawtooth')
+                elif event.key in self._wave_keys:
+                    wave_type = self._wave_keys[event.key]
+                    self.osc_module.osc.set_wave_type(wave_type)
                     if self.synth:
-                        self.synth.set_wave_type('sawtooth')
-                elif event.key == pygame.K_3:
-                    self.osc_module.osc.set_wave_type('square')
-                    if self.synth:
-                        self.synth.set_wave_type('square')
-                elif event.key == pygame.K_4:
-                    self.osc_module.osc.set_wave_type('triangle')
-                    if self.synth:
-                        self.synth.set_wave_type('triangle')
+                        self.synth.send('set_wave_type', wave_type)
 
                 # 预设快捷键
-                elif event.key == pygame.K_5:
-                    self.load_preset('Lead')
-                elif event.key == pygame.K_6:
-                    self.load_preset('Bass')
-                elif event.key == pygame.K_7:
-                    self.load_preset('Pad')
+                elif event.key in self._preset_keys:
+                    self.load_preset(self._preset_keys[event.key])
 
                 # ESC - 退出
                 elif event.key == pygame.K_ESCAPE:
@@ -503,15 +693,14 @@ class SynthGUI:
             elif event.type == pygame.KEYUP:
                 if event.key in self.active_keys:
                     self.active_keys.remove(event.key)
+                    self._refresh_active_keys_text()
                     # 停止实时音频
                     if self.synth:
-                        self.synth.note_off()
+                        self.synth.send('note_off')
             
             # 模块事件处理
-            elif event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION]:
-                for module in [self.osc_module, self.filter_module, self.env_module, self.lfo_module]:
-                    if module.handle_event(event):
-                        break
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                self._handle_mouse(event)
     
     def update_audio(self):
         """更新音频"""
@@ -551,7 +740,7 @@ class SynthGUI:
         self.waveform.draw(self.screen, self.font)
         
         # 绘制连接线（简化版）
-        self.draw_connections()
+        self.draw_connections(self.screen)
         
         # 绘制状态栏
         self.draw_status_bar()
@@ -566,6 +755,50 @@ class SynthGUI:
         
         pygame.display.flip()
     
+    def _module_at(self, pos):
+        """返回pos所在的模块 (没有则返回None)"""
+        index = (pos[0] - self.osc_module.rect.x) // self._module_stride
+        if 0 <= index < len(self._modules) and self._modules[index].rect.collidepoint(pos):
+            return self._modules[index]
+        return None
+    
+    def _handle_mouse(self, event):
+        """鼠标事件: 拖动中的旋钮直接处理, 按下时只检查鼠标所在模块的旋钮"""
+        if self._dragging_knob is not None:
+            self._dragging_knob.handle_event(event)
+            if event.type == pygame.MOUSEBUTTONUP:
+                self._dragging_knob = None
+            return
+        
+        # 没有拖动时旋钮只响应按下
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            return
+        
+        module = self._module_at(event.pos)
+        if module is None:
+            return
+        for knob in module.knobs:
+            if knob.handle_event(event):
+                self._dragging_knob = knob
+                return
+    
+    def _enable_vsync(self):
+        """切换到垂直同步的显示模式, 成功时帧率由flip/update阻塞到显示器刷新来控制"""
+        # 重新设置显示模式后屏幕内容需要整屏重绘
+        self._full_redraw = True
+        try:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+        except pygame.error as e:
+            print(f"⚠️ 无法开启垂直同步 ({e}), 继续使用FramePacer控制帧率")
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            return False
+        self._vsync = True
+        return True
+    
+    def _refresh_active_keys_text(self):
+        """按键集合变化后重建状态栏的按键文字"""
+        self._active_keys_text = f"Active Keys: {len(self.active_keys)}"
+    
     def draw_status_bar(self):
         """绘制状态栏"""
         # 状态栏背景
@@ -607,78 +840,158 @@ class SynthGUI:
             self.screen.blit(vol_surf, (SCREEN_WIDTH - 150, status_y + 8))
     
     def update_audio(self):
-        """更新音频"""
-        # 生成一些测试音频
+        """更新音频 (参数不变时沿用上一次的波形)"""
         osc = self.osc_module.osc
-        audio = osc.generate(duration=0.05)
+        filt = self.filter_module.filter
+        key = (osc.frequency, osc.wave_type, filt.cutoff, filt.filter_type)
+        # 参数相同则生成结果完全相同; 只有噪声在演奏时需要持续刷新
+        live_noise = osc.wave_type == 'noise' and self.active_keys
+        if key == self._audio_key and self.audio_buffer is not None and not live_noise:
+            return
+        self._audio_key = key
+        
+        # 生成一些测试音频
+        audio = osc.generate(duration=0.05, out=self._preview_buf)
         
         # 应用滤波器
-        filtered = self.filter_module.filter.process(audio)
+        filtered = filt.process(audio, out=self._filtered_buf)
         
         self.audio_buffer = filtered
         self.waveform.set_audio(filtered)
+        self._audio_version += 1
     
-    def draw(self):
-        """绘制界面"""
+    def _draw_static(self, surface):
+        """把整个会话中不变的部分 (标题/模块框架/波形显示背景/连接线) 画到surface上"""
         # 背景
-        self.screen.fill(COLOR_BG)
+        surface.fill(COLOR_BG)
+        
+        blits = []
         
         # 标题
-        title = self.font.render("🎹 Modular Synth Studio - Nana's Project", True, COLOR_TEXT)
-        self.screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 30))
+        title = render_text(self.font, "🎹 Modular Synth Studio - Nana's Project", COLOR_TEXT)
+        blits.append((title, (SCREEN_WIDTH//2 - title.get_width()//2, 30)))
         
         # 副标题
-        subtitle = self.small_font.render("按 A-S-D-F-G-H-J-K 键播放音符 | 用鼠标拖动旋钮调节参数", True, (150, 150, 180))
-        self.screen.blit(subtitle, (SCREEN_WIDTH//2 - subtitle.get_width()//2, 60))
-        
-        # 绘制模块
-        self.osc_module.draw(self.screen, self.font)
-        self.filter_module.draw(self.screen, self.font)
-        self.env_module.draw(self.screen, self.font)
-        self.lfo_module.draw(self.screen, self.font)
+        subtitle = render_text(self.small_font, "按 A-S-D-F-G-H-J-K 键播放音符 | 用鼠标拖动旋钮调节参数", (150, 150, 180))
+        blits.append((subtitle, (SCREEN_WIDTH//2 - subtitle.get_width()//2, 60)))
         
-        # 绘制波形显示
-        self.waveform.draw(self.screen, self.font)
+        for module in (self.osc_module, self.filter_module, self.env_module, self.lfo_module, self.waveform):
+            module.draw_static(surface, self.font, blits)
         
         # 绘制连接线（简化版）
-        self.draw_connections()
+        self.draw_connections(surface)
         
-        # 绘制状态
-        status = f"FPS: {self.clock.get_fps():.1f} | Active Keys: {len(self.active_keys)}"
-        status_surf = self.small_font.render(status, True, COLOR_TEXT)
-        self.screen.blit(status_surf, (10, SCREEN_HEIGHT - 25))
-
-        # 绘制预设名称
+        surface.blits(blits, doreturn=False)
+    
+    def draw(self):
+        """绘制界面: 只重绘状态有变化的区域, 其余部分保留上一帧的内容"""
+        full = self._full_redraw
+        if full:
+            # 背景 (预渲染的静态部分)
+            self.screen.blit(self._bg, (0, 0))
+        
+        # 状态
+        status = f"FPS: {self.clock.get_fps():.1f} | {self._active_keys_text}"
+        if status != self._status_text:
+            self._status_text = status
+            surf = self._status_surfs.get(status)
+            if surf is None:
+                if len(self._status_surfs) >= STATUS_CACHE_SIZE:
+                    self._status_surfs.clear()
+                surf = self.small_font.render(status, True, COLOR_TEXT).convert_alpha()
+                self._status_surfs[status] = surf
+            self._status_surf = surf
+        
+        # 预设名称
         preset_text = f"Preset: {self.current_preset}"
-        preset_surf = self.small_font.render(preset_text, True, (150, 200, 255))
-        self.screen.blit(preset_surf, (200, SCREEN_HEIGHT - 25))
-
-        # 绘制状态消息
+        preset_surf = render_text(self.small_font, preset_text, (150, 200, 255))
+        status_blits = [(self._status_surf, (10, SCREEN_HEIGHT - 25)),
+                        (preset_surf, (200, SCREEN_HEIGHT - 25))]
+        
+        # 状态消息
+        message_blits = []
         if self.status_timer > 0 and self.status_message:
-            msg_surf = self.font.render(self.status_message, True, (100, 255, 100))
-            self.screen.blit(msg_surf, (SCREEN_WIDTH//2 - msg_surf.get_width()//2, SCREEN_HEIGHT - 60))
+            msg_surf = render_text(self.font, self.status_message, (100, 255, 100))
+            message_blits.append((msg_surf, (SCREEN_WIDTH//2 - msg_surf.get_width()//2, SCREEN_HEIGHT - 60)))
             self.status_timer -= 1
+            message = self.status_message
+        else:
+            message = None
+        
+        # (区域, 决定外观的状态, 绘制函数)
+        regions = [
+            (self.osc_module.rect, self.osc_module.state_key(), self.osc_module.draw),
+            (self.filter_module.rect, self.filter_module.state_key(), self.filter_module.draw),
+            (self.env_module.rect, self.env_module.state_key(), self.env_module.draw),
+            (self.lfo_module.rect, self.lfo_module.state_key(), self.lfo_module.draw),
+            (self.waveform.rect, self._audio_version, self.waveform.draw),
+            (self._status_rect, (status, preset_text), lambda surface, font, blits: blits.extend(status_blits)),
+            (self._message_rect, message, lambda surface, font, blits: blits.extend(message_blits)),
+        ]
         
-        pygame.display.flip()
+        changed = []
+        for rect, key, draw in regions:
+            region = tuple(rect)
+            if not full and self._region_keys.get(region, self) == key:
+                continue
+            self._region_keys[region] = key
+            changed.append((rect, draw))
+        dirty = [rect for rect, _ in changed]
+        
+        # 先用背景一次性盖掉这些区域上一帧的内容, 再逐个重绘
+        if not full:
+            self.screen.blits([(self._bg, rect, rect) for rect in dirty], doreturn=False)
+        
+        # 文字统一收集, 最后一次blits绘制; 各区域的draw里只剩pygame.draw调用,
+        # 整段只锁一次屏幕 (blit不能在锁定期间进行, 所以要在blits之前解锁)
+        blits = []
+        self.screen.lock()
+        try:
+            for rect, draw in changed:
+                draw(self.screen, self.font, blits)
+        finally:
+            self.screen.unlock()
+        
+        self.screen.blits(blits, doreturn=False)
+        self._present(dirty)
     
-    def draw_connections(self):
+    def _present(self, dirty):
+        """只把重绘过的区域更新到屏幕; 变化面积过大或需要整屏重绘时flip"""
+        if self._full_redraw:
+            self._full_redraw = False
+            pygame.display.flip()
+        elif sum(r.width * r.height for r in dirty) > SCREEN_WIDTH * SCREEN_HEIGHT * DIRTY_AREA_LIMIT:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        elif self._vsync:
+            # 垂直同步时靠present阻塞控制帧率, 没有变化的帧也要flip, 否则主循环会空转
+            pygame.display.flip()
+    
+    def draw_connections(self, surface):
         """绘制模块连接线（简化版）"""
         # OSC -> FILTER
         start = (self.osc_module.rect.right, self.osc_module.rect.centery)
         end = (self.filter_module.rect.left, self.filter_module.rect.centery)
-        pygame.draw.line(self.screen, (100, 100, 150), start, end, 3)
+        pygame.draw.line(surface, (100, 100, 150), start, end, 3)
 
         # FILTER -> ENV (概念上的)
         start = (self.filter_module.rect.right, self.filter_module.rect.centery + 50)
         end = (self.env_module.rect.left, self.env_module.rect.centery + 50)
-        pygame.draw.line(self.screen, (100, 100, 150), start, end, 3)
+        pygame.draw.line(surface, (100, 100, 150), start, end, 3)
 
     # ============ 预设管理 ============
 
     def load_presets_list(self):
-        """加载预设列表"""
+        """加载预设列表 (预设目录没有变化时直接沿用上次的结果)"""
+        mtime = os.stat(self.presets_dir).st_mtime_ns
+        if mtime == self._presets_dir_mtime:
+            return
+        self._presets_dir_mtime = mtime
+
         self.presets = {}
-        preset_files = [f for f in os.listdir(self.presets_dir) if f.endswith('.json')]
+        with os.scandir(self.presets_dir) as it:
+            preset_files = [e.name for e in it if e.name.endswith('.json')]
         for pf in preset_files:
             preset_name = pf[:-5]  # 移除.json
             self.presets[preset_name] = os.path.join(self.presets_dir, pf)
@@ -758,8 +1071,13 @@ class SynthGUI:
         else:
             # 保存到文件
             filepath = os.path.join(self.presets_dir, f'{preset_name}.json')
-            with open(filepath, 'w') as f:
-                json.dump(preset_data, f, indent=2)
+            # 预设文件保持缩进格式, 方便用户查看和手动修改
+            if HAS_ORJSON:
+                payload = orjson.dumps(preset_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                payload = json.dumps(preset_data, indent=2).encode()
+            with open(filepath, 'wb') as f:
+                f.write(payload)
             self.presets[preset_name] = filepath
 
         self.current_preset = preset_name
@@ -776,8 +1094,9 @@ class SynthGUI:
         if isinstance(preset_data, dict):
             data = preset_data
         else:
-            with open(preset_data, 'r') as f:
-                data = json.load(f)
+            with open(preset_data, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
 
         # 应用设置
         self.osc_module.osc.set_frequency(data.get('osc_frequency', 440.0))
@@ -829,12 +1148,24 @@ class SynthGUI:
             if not self.loading_screen.render():
                 break
         
+        # 加载画面会重新设置显示模式, 所以垂直同步在进入主循环前才开启
+        if VSYNC:
+            self._enable_vsync()
+        
         # 主循环
         while self.running:
             self.handle_events()
-            self.update_audio()
+            
+            # 波形预览按较低频率刷新
+            now = pygame.time.get_ticks()
+            if self._last_audio_update is None or now - self._last_audio_update >= AUDIO_UPDATE_INTERVAL_MS:
+                self.update_audio()
+                self._last_audio_update = now
+            
             self.draw()
-            self.clock.tick(60)
+            self.clock.tick()
+            if not self._vsync:
+                self.pacer.tick()
 
         # 停止实时音频
         if self.synth:
@@ -7,7 +7,7 @@ import json
 import os
 import numpy as np
 from audio.core_modules import Oscillator, Filter, Envelope, LFO, MultiOscillator
-from gui.theme_system import ThemeManager, LayoutConfig, draw_knob_with_theme, draw_rounded_rect
+from gui.theme_system import ThemeManager, LayoutConfig, draw_knob_with_theme, draw_rounded_rect, render_text
 
 # 尝试导入实时音频模块
 try:
@@ -17,6 +17,12 @@ except ImportError:
     HAS_REALTIME_AUDIO = False
     print("⚠️ 实时音频模块不可用")
 
+# 波形预览的刷新间隔 (毫秒, 约15Hz); 绘制仍按60FPS进行
+AUDIO_UPDATE_INTERVAL_MS = 66
+
+# 状态栏文字缓存的最大条数 (超过后整体清空)
+STATUS_CACHE_SIZE = 256
+
 
 # ============ 旋钮控件 v0.6.0 ============
 class ModernKnob:
@@ -37,7 +43,7 @@ class ModernKnob:
     
     def draw(self, surface, font):
         # 绘制标签
-        label_surf = font.render(self.label, True, self.theme.get_color('text_secondary'))
+        label_surf = render_text(font, self.label, self.theme.get_color('text_secondary'))
         surface.blit(label_surf, (self.rect.centerx - label_surf.get_width()//2, self.rect.y - 18))
         
         # 绘制旋钮
@@ -47,7 +53,7 @@ class ModernKnob:
         # 显示数值
         if self.show_value:
             value_str = f"{self.value:.1f}" if self.max_val - self.min_val > 10 else f"{self.value:.2f}"
-            value_surf = font.render(value_str, True, self.theme.get_color('text_accent'))
+            value_surf = render_text(font, value_str, self.theme.get_color('text_accent'))
             surface.blit(value_surf, (self.rect.centerx - value_surf.get_width()//2, self.rect.bottom + 2))
     
     def handle_event(self, event):
@@ -98,7 +104,7 @@ class ModernButton:
         pygame.draw.rect(surface, border_color, self.rect, 2, border_radius=6)
         
         # 文字
-        text_surf = font.render(self.text, True, self.theme.get_color('text_primary'))
+        text_surf = render_text(font, self.text, self.theme.get_color('text_primary'))
         surface.blit(text_surf, (self.rect.centerx - text_surf.get_width()//2, 
                                   self.rect.centery - text_surf.get_height()//2))
     
@@ -164,7 +170,7 @@ class ModernModule:
         draw_rounded_rect(surface, self.theme.get_color('bg_panel'), title_bg, radius=10)
         
         # 标题文字
-        title_surf = font.render(self.title.upper(), True, self.theme.get_color('text_accent'))
+        title_surf = render_text(font, self.title.upper(), self.theme.get_color('text_accent'))
         surface.blit(title_surf, (self.rect.x + 15, self.rect.y + 12))
         
         # 分割线
@@ -238,6 +244,12 @@ class OscillatorModuleV2(ModernModule):
             led = LEDIndicator(led_x, led_y, size=8, color_on=self.wave_colors[i], theme_manager=theme_manager)
             self.leds.append(led)
         self.leds[0].state = True
+        
+        # 波形预览的x坐标只取决于预览长度和模块位置, 预先算好每帧复用
+        wave_rect = pygame.Rect(self.rect.x + 15, self.rect.y + 220, self.rect.width - 30, 100)
+        n = int(0.05 * self.osc.sample_rate)
+        xs = wave_rect.x + 10 + np.arange(n) * (wave_rect.width - 20) // n
+        self._preview_xs = xs[xs <= wave_rect.right - 10]
     
     def set_wave(self, index):
         self.current_wave = index
@@ -264,14 +276,11 @@ class OscillatorModuleV2(ModernModule):
         pygame.draw.rect(surface, self.theme.get_color('bg_panel'), wave_rect, border_radius=6)
         
         # 绘制波形线
-        points = []
-        for i, y in enumerate(wave_preview):
-            x = wave_rect.x + 10 + i * (wave_rect.width - 20) // len(wave_preview)
-            if x <= wave_rect.right - 10:
-                points.append((x, y))
+        xs = self._preview_xs
+        points = np.column_stack((xs, wave_preview[:len(xs)]))
         
         if len(points) > 1:
-            pygame.draw.lines(surface, self.wave_colors[self.current_wave], False, points, 2)
+            pygame.draw.lines(surface, self.wave_colors[self.current_wave], False, points.tolist(), 2)
 
 
 # ============ 滤波器模块 v0.6.0 ============
@@ -360,19 +369,19 @@ class EnvelopeModuleV2(ModernModule):
         knob_spacing = 40
         
         attack_knob = ModernKnob(x + 20, knob_y, "A", 0.001, 2.0, 0.1,
-                                 lambda v: setattr(self.env, 'attack', v), size=38)
+                                 self._set_attack, size=38)
         self.knobs.append(attack_knob)
         
         decay_knob = ModernKnob(x + 20 + knob_spacing, knob_y, "D", 0.01, 2.0, 0.2,
-                                lambda v: setattr(self.env, 'decay', v), size=38)
+                                self._set_decay, size=38)
         self.knobs.append(decay_knob)
         
         sustain_knob = ModernKnob(x + 20 + knob_spacing * 2, knob_y, "S", 0.0, 1.0, 0.7,
-                                  lambda v: setattr(self.env, 'sustain', v), size=38)
+                                  self._set_sustain, size=38)
         self.knobs.append(sustain_knob)
         
         release_knob = ModernKnob(x + 20 + knob_spacing * 3, knob_y, "R", 0.01, 3.0, 0.3,
-                                  lambda v: setattr(self.env, 'release', v), size=38)
+                                  self._set_release, size=38)
         self.knobs.append(release_knob)
         
         # 增益旋钮
@@ -380,6 +389,18 @@ class EnvelopeModuleV2(ModernModule):
                                lambda v: None, size=44)
         self.knobs.append(gain_knob)
     
+    def _set_attack(self, v):
+        self.env.attack = v
+    
+    def _set_decay(self, v):
+        self.env.decay = v
+    
+    def _set_sustain(self, v):
+        self.env.sustain = v
+    
+    def _set_release(self, v):
+        self.env.release = v
+    
     def draw(self, surface, font):
         super().draw(surface, font)
         
@@ -424,6 +445,11 @@ class LFOModuleV2(ModernModule):
             
             btn = ModernButton(btn_x, btn_y, 38, 25, wave_name, make_callback(), theme_manager)
             self.buttons.append(btn)
+        
+        # LFO波形的x坐标同样预先算好
+        n = int(0.5 * self.lfo.sample_rate)
+        xs = self.rect.x + 20 + np.arange(n) * (self.rect.width - 40) // n
+        self._preview_xs = xs[xs <= self.rect.right - 20]
     
     def set_wave(self, index):
         self.current_wave = index
@@ -436,14 +462,11 @@ class LFOModuleV2(ModernModule):
         wave = self.lfo.generate(duration=0.5)
         wave = wave * 30 + self.rect.y + 210
         
-        points = []
-        for i, y in enumerate(wave):
-            x = self.rect.x + 20 + i * (self.rect.width - 40) // len(wave)
-            if x <= self.rect.right - 20:
-                points.append((x, y))
+        xs = self._preview_xs
+        points = np.column_stack((xs, wave[:len(xs)]))
         
         if len(points) > 1:
-            pygame.draw.lines(surface, self.theme.get_color('waveform'), False, points, 2)
+            pygame.draw.lines(surface, self.theme.get_color('waveform'), False, points.tolist(), 2)
 
 
 # ============ 波形显示器 v0.6.0 ============
@@ -475,7 +498,7 @@ class WaveformDisplayV2:
         pygame.draw.rect(surface, self.theme.get_color('bg_panel'), title_bg, border_radius=6)
         
         # 标题
-        title = font.render("OUTPUT WAVEFORM", True, self.theme.get_color('text_accent'))
+        title = render_text(font, "OUTPUT WAVEFORM", self.theme.get_color('text_accent'))
         surface.blit(title, (self.rect.x + 15, self.rect.y + 8))
         
         # 绘制中心线
@@ -557,9 +580,18 @@ class SynthGUIV2:
             self.theme
         )
         
+        # 鼠标事件分发
+        self._modules = [self.osc_module, self.filter_module, self.env_module, self.lfo_module]
+        self._dragging_knob = None
+        
         # 状态变量
         self.running = True
         self.audio_buffer = None
+        self._last_audio_update = None  # 上次刷新波形预览的时间 (毫秒)
+        
+        # 状态栏文字随FPS几乎每帧都变, 但稳定运行时只在少数几个值之间来回,
+        # 用单独的缓存保存渲染结果, 不占用共享文字缓存
+        self._status_surfs = {}
         
         # 键盘音阶
         self.key_notes = {
@@ -598,10 +630,16 @@ class SynthGUIV2:
                 preset_name, lambda p=preset_name: self.load_preset(p), self.theme
             )
             self.preset_buttons.append(btn)
+        
+        # 静态背景层 (背景色/标题/连接线), 只在主题切换时重建
+        # (convert()要在set_mode之后调用, 转成显示格式后blit走同格式的快速路径)
+        self._bg_layer = pygame.Surface((LayoutConfig.SCREEN_WIDTH, LayoutConfig.SCREEN_HEIGHT)).convert()
+        self._draw_background(self._bg_layer)
     
     def cycle_theme(self):
         """切换主题"""
         theme_name = self.theme.cycle_theme()
+        self._draw_background(self._bg_layer)
         self.show_status(f"🎨 主题: {theme_name}")
     
     def handle_events(self):
@@ -638,13 +676,30 @@ class SynthGUIV2:
             
             # 模块事件
             elif event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION]:
-                for module in [self.osc_module, self.filter_module, self.env_module, self.lfo_module]:
-                    if module.handle_event(event):
-                        break
-                
-                self.theme_btn.handle_event(event)
-                for btn in self.preset_buttons:
-                    btn.handle_event(event)
+                self._handle_mouse(event)
+    
+    def _handle_mouse(self, event):
+        """鼠标事件: 拖动中的旋钮直接处理, 没有拖动时移动事件只用来更新按钮的悬停状态"""
+        if event.type == pygame.MOUSEMOTION:
+            if self._dragging_knob is not None:
+                self._dragging_knob.handle_event(event)
+            else:
+                for module in self._modules:
+                    for button in module.buttons:
+                        button.handle_event(event)
+        else:
+            for module in self._modules:
+                if module.handle_event(event):
+                    break
+            
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self._dragging_knob = next((knob for module in self._modules for knob in module.knobs if knob.dragging), None)
+            else:
+                self._dragging_knob = None
+        
+        self.theme_btn.handle_event(event)
+        for btn in self.preset_buttons:
+            btn.handle_event(event)
     
     def update_audio(self):
         """更新音频"""
@@ -654,21 +709,29 @@ class SynthGUIV2:
         self.audio_buffer = filtered
         self.waveform.set_audio(filtered)
     
-    def draw(self):
-        """绘制界面"""
+    def _draw_background(self, surface):
+        """把只随主题变化的部分 (背景/标题/连接线) 画到surface上"""
         # 背景渐变（使用实色）
         bg_color = self.theme.get_color('bg_primary')
-        self.screen.fill(bg_color)
+        surface.fill(bg_color)
         
         # 标题
-        title = self.title_font.render("🎹 Modular Synth Studio v0.6.0", True, 
-                                       self.theme.get_color('text_primary'))
-        self.screen.blit(title, (20, 20))
+        title = render_text(self.title_font, "🎹 Modular Synth Studio v0.6.0", 
+                            self.theme.get_color('text_primary'))
+        surface.blit(title, (20, 20))
         
         # 副标题
-        subtitle = self.small_font.render("A-S-D-F-G-H-J-K: 演奏 | 鼠标: 调节参数 | +/-: 音量", 
-                                         True, self.theme.get_color('text_secondary'))
-        self.screen.blit(subtitle, (20, 55))
+        subtitle = render_text(self.small_font, "A-S-D-F-G-H-J-K: 演奏 | 鼠标: 调节参数 | +/-: 音量", 
+                               self.theme.get_color('text_secondary'))
+        surface.blit(subtitle, (20, 55))
+        
+        # 绘制连接线
+        self.draw_connections(surface)
+    
+    def draw(self):
+        """绘制界面"""
+        # 背景 (预渲染的静态层)
+        self.screen.blit(self._bg_layer, (0, 0))
         
         # 绘制模块
         self.osc_module.draw(self.screen, self.font)
@@ -679,9 +742,6 @@ class SynthGUIV2:
         # 绘制波形
         self.waveform.draw(self.screen, self.font)
         
-        # 绘制连接线
-        self.draw_connections()
-        
         # 绘制按钮
         self.theme_btn.draw(self.screen, self.small_font)
         for btn in self.preset_buttons:
@@ -692,19 +752,25 @@ class SynthGUIV2:
         pygame.draw.rect(self.screen, self.theme.get_color('bg_panel'), status_bg)
         
         status = f"FPS: {self.clock.get_fps():.1f} | Keys: {len(self.active_keys)} | Preset: {self.current_preset}"
-        status_surf = self.small_font.render(status, True, self.theme.get_color('text_secondary'))
+        key = (status, self.theme.get_color('text_secondary'))
+        status_surf = self._status_surfs.get(key)
+        if status_surf is None:
+            if len(self._status_surfs) >= STATUS_CACHE_SIZE:
+                self._status_surfs.clear()
+            status_surf = self.small_font.render(status, True, key[1]).convert_alpha()
+            self._status_surfs[key] = status_surf
         self.screen.blit(status_surf, (10, LayoutConfig.SCREEN_HEIGHT - 20))
         
         # 状态消息
         if self.status_timer > 0 and self.status_message:
-            msg_surf = self.font.render(self.status_message, True, self.theme.get_color('text_accent'))
+            msg_surf = render_text(self.font, self.status_message, self.theme.get_color('text_accent'))
             self.screen.blit(msg_surf, (LayoutConfig.SCREEN_WIDTH//2 - msg_surf.get_width()//2, 
                                         LayoutConfig.SCREEN_HEIGHT - 55))
             self.status_timer -= 1
         
         pygame.display.flip()
     
-    def draw_connections(self):
+    def draw_connections(self, surface):
         """绘制模块连接线"""
         cable_color = self.theme.get_color('cable')
         active_color = self.theme.get_color('cable_active')
@@ -712,12 +778,12 @@ class SynthGUIV2:
         # OSC -> FILTER
         start = (self.osc_module.rect.right - 5, self.osc_module.rect.centery)
         end = (self.filter_module.rect.left + 5, self.filter_module.rect.centery)
-        pygame.draw.line(self.screen, cable_color, start, end, 4)
+        pygame.draw.line(surface, cable_color, start, end, 4)
         
         # FILTER -> ENV
         start = (self.filter_module.rect.right - 5, self.filter_module.rect.centery + 30)
         end = (self.env_module.rect.left + 5, self.env_module.rect.centery + 30)
-        pygame.draw.line(self.screen, cable_color, start, end, 3)
+        pygame.draw.line(surface, cable_color, start, end, 3)
     
     def load_preset(self, preset_name):
         """加载预设"""
@@ -743,7 +809,13 @@ class SynthGUIV2:
         
         while self.running:
             self.handle_events()
-            self.update_audio()
+            
+            # 波形预览按较低频率刷新
+            now = pygame.time.get_ticks()
+            if self._last_audio_update is None or now - self._last_audio_update >= AUDIO_UPDATE_INTERVAL_MS:
+                self.update_audio()
+                self._last_audio_update = now
+            
             self.draw()
             self.clock.tick(60)
         
@@ -2,7 +2,9 @@
 # 🎨 Modular Synth 主题系统 - v0.6.0
 # Nana的虚拟模块合成器 - 现代化主题
 
+import math
 import pygame
+from collections import OrderedDict
 
 # ============ 主题配置 ============
 class ThemeColors:
@@ -157,6 +159,29 @@ class LayoutConfig:
     FONT_SMALL = 14
 
 
+# ============ 文字渲染缓存 ============
+# (字体, 文字, 颜色) -> 已渲染的Surface, 按LRU顺序淘汰
+TEXT_CACHE_SIZE = 512
+_TEXT_CACHE = OrderedDict()
+
+
+def render_text(font, text, color):
+    """渲染抗锯齿文字 (结果缓存, 相同文字不再重复光栅化)"""
+    key = (font, text, color)
+    surf = _TEXT_CACHE.get(key)
+    if surf is not None:
+        _TEXT_CACHE.move_to_end(key)
+        return surf
+    
+    surf = font.render(text, True, color)
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha()
+    _TEXT_CACHE[key] = surf
+    if len(_TEXT_CACHE) > TEXT_CACHE_SIZE:
+        _TEXT_CACHE.popitem(last=False)
+    return surf
+
+
 # ============ 视觉增强函数 ============
 def draw_glow_surface(surface, color, rect, radius=10, intensity=0.5):
     """绘制发光效果"""
@@ -199,10 +224,10 @@ def draw_knob_with_theme(surface, rect, value, theme, label="", show_value=True)
     
     # 旋钮指示器
     angle = (value - 0.5) * 270  # -135 到 135 度
-    angle_rad = pygame.math.radians(angle + 90)  # 调整为顶部为0
+    angle_rad = math.radians(angle + 90)  # 调整为顶部为0
     
-    indicator_x = center_x + (radius - 8) * pygame.math.cos(angle_rad)
-    indicator_y = center_y + (radius - 8) * pygame.math.sin(angle_rad)
+    indicator_x = center_x + (radius - 8) * math.cos(angle_rad)
+    indicator_y = center_y + (radius - 8) * math.sin(angle_rad)
     
     pygame.draw.line(surface, theme.get_color('knob_indicator'), 
                     (center_x, center_y), (indicator_x, indicator_y), 3)
@@ -374,6 +374,8 @@ class SpectrumAnalyzer:
 class KeyLight:
     """键盘按键灯光效果"""
     
+    _label_font = None  # 所有按键共用的标签字体 (首次绘制时创建)
+    
     def __init__(self, rect, note_name, color=(100, 200, 255)):
         self.rect = rect
         self.note_name = note_name
@@ -382,6 +384,7 @@ class KeyLight:
         self.pressed = False
         self.press_animation = 0.0
         self.glow_radius = 8
+        self._label_surf = None
     
     def update(self, dt):
         """更新灯光状态"""
@@ -417,9 +420,12 @@ class KeyLight:
                 pygame.draw.rect(surface, (*self.current_color[:3], alpha), 
                                 glow_rect, border_radius=6)
         
-        # 音符标签
-        font = pygame.font.Font(None, 24)
-        text = font.render(self.note_name, True, (255, 255, 255))
+        # 音符标签 (字体和文字都只渲染一次)
+        if self._label_surf is None:
+            if KeyLight._label_font is None:
+                KeyLight._label_font = pygame.font.Font(None, 24)
+            self._label_surf = KeyLight._label_font.render(self.note_name, True, (255, 255, 255))
+        text = self._label_surf
         surface.blit(text, (
             self.rect.centerx - text.get_width() // 2,
             self.rect.bottom - 20
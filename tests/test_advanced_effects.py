@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# 🎛️ Modular Synth - 高级效果器测试
+
+import sys
+import numpy as np
+import pytest
+sys.path.insert(0, '..')
+
+import audio.advanced_effects as advanced_effects
+from audio.advanced_effects import (
+    ParametricEQ, MAX_UNROLLED_BANDS, _biquad_scan, _biquad_cascade, _unrolled_cascade
+)
+
+
+def make_eq(num_bands, seed=0):
+    """生成含num_bands个随机频段的均衡器"""
+    rng = np.random.default_rng(seed)
+    eq = ParametricEQ()
+    eq.bands = []
+    for _ in range(num_bands):
+        eq.add_band(
+            band_type=str(rng.choice(['low_shelf', 'high_shelf', 'peak'])),
+            frequency=float(rng.uniform(50, 15000)),
+            gain_db=float(rng.uniform(-12, 12)),
+            q=float(rng.uniform(0.3, 4.0))
+        )
+    return eq
+
+
+def reference_cascade(eq, signal):
+    """逐样本串联 EQBand.process 的参考结果 (零初始状态)"""
+    for band in eq.bands:
+        band.reset()
+    output = np.array([eq.process(float(sample)) for sample in signal])
+    for band in eq.bands:
+        band.reset()
+    return output
+
+
+class TestParametricEQ:
+    """参数均衡器块处理测试"""
+    
+    @pytest.mark.parametrize("has_numba", [True, False])
+    @pytest.mark.parametrize("num_bands", [0, 1, 3, MAX_UNROLLED_BANDS, MAX_UNROLLED_BANDS + 4])
+    def test_process_block_matches_per_sample(self, monkeypatch, has_numba, num_bands):
+        """测试两条块处理路径 (编译内核/前缀扫描) 与逐样本串联结果一致"""
+        monkeypatch.setattr(advanced_effects, 'HAS_NUMBA', has_numba)
+        eq = make_eq(num_bands, seed=num_bands)
+        signal = np.random.default_rng(1).uniform(-1, 1, 3000)
+        
+        expected = reference_cascade(eq, signal)
+        output = eq.process_block(signal)
+        
+        assert output.shape == signal.shape
+        assert np.allclose(output, expected, rtol=1e-7, atol=1e-9)
+        print("✓ EQ process_block test passed")
+    
+    def test_biquad_scan_single_band(self):
+        """测试前缀扫描与单个频段的逐样本结果一致, 并保持输入dtype"""
+        eq = make_eq(1, seed=7)
+        band = eq.bands[0]
+        signal = np.random.default_rng(2).uniform(-1, 1, 1025)
+        
+        expected = reference_cascade(eq, signal)
+        output = _biquad_scan(signal, band.b0, band.b1, band.b2, band.a1, band.a2)
+        assert np.allclose(output, expected, rtol=1e-7, atol=1e-9)
+        
+        output32 = _biquad_scan(signal.astype(np.float32), band.b0, band.b1, band.b2, band.a1, band.a2)
+        assert output32.dtype == np.float32
+        assert np.allclose(output32, expected, atol=1e-4)
+        assert len(_biquad_scan(np.zeros(0), 1.0, 0.0, 0.0, 0.0, 0.0)) == 0
+        print("✓ Biquad scan test passed")
+    
+    @pytest.mark.parametrize("num_bands", [1, 3, MAX_UNROLLED_BANDS])
+    def test_unrolled_cascade_matches_generic(self, num_bands):
+        """测试展开内核与通用内核结果一致, 且状态可以跨块延续"""
+        coeffs = make_eq(num_bands, seed=num_bands).get_coefficients()
+        signal = np.random.default_rng(3).uniform(-1, 1, 2000)
+        
+        generic = _biquad_cascade(signal, coeffs, np.zeros((num_bands, 2)), np.empty_like(signal))
+        
+        cascade = _unrolled_cascade(num_bands)
+        assert _unrolled_cascade(num_bands) is cascade
+        state = np.zeros((num_bands, 2))
+        first = cascade(signal[:700], coeffs, state, np.empty(700))
+        second = cascade(signal[700:], coeffs, state, np.empty(1300))
+        
+        assert np.allclose(np.concatenate((first, second)), generic, rtol=1e-9, atol=1e-12)
+        print("✓ Unrolled cascade test passed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# ☁️ Modular Synth - 用户系统测试
+
+import sys
+import time
+import pytest
+sys.path.insert(0, '..')
+
+from cloud.user import UserManager
+
+
+class TestPassword:
+    """密码验证测试"""
+    
+    def test_verify_password(self, tmp_path):
+        """测试密码验证, 以及损坏的哈希值不会抛出异常"""
+        manager = UserManager(str(tmp_path))
+        user = manager.create_user('alice', 'alice@test.com', 'secret')[0]
+        
+        assert user.verify_password('secret')
+        assert not user.verify_password('wrong')
+        
+        for bad_hash in ('', 'not-hex', 'abc', '密码'):
+            user.password_hash = bad_hash
+            assert not user.verify_password('secret')
+        print("✓ Verify password test passed")
+
+
+class TestTokenTable:
+    """紧凑token表测试"""
+    
+    def test_table_matches_dict(self, tmp_path):
+        """测试合并进紧凑表后的查找结果与字典路径一致"""
+        manager = UserManager(str(tmp_path))
+        users = [manager.create_user(f'user{i}', f'user{i}@test.com', 'pw')[0] for i in range(5)]
+        
+        tokens = [manager._generate_token(users[i % 5].user_id) for i in range(200)]
+        # 部分token在合并前就已过期
+        now = time.time_ns()
+        for token in tokens[:20]:
+            manager.token_expiry[manager._token_key(token)] = now - 1
+        unknown = [f'unknown-{i}' for i in range(50)]
+        
+        def lookup(token):
+            user, _ = manager._lookup_token(manager._token_key(token), time.time_ns())
+            return user.user_id if user else None
+        
+        expected = {token: lookup(token) for token in tokens + unknown}
+        manager._compact_tokens()
+        
+        assert not manager.tokens
+        assert {token: lookup(token) for token in tokens + unknown} == expected
+        assert all(expected[token] is None for token in tokens[:20] + unknown)
+        assert all(expected[token] is not None for token in tokens[20:])
+        print("✓ Token table lookup test passed")
+    
+    def test_table_uses_full_digest(self, tmp_path):
+        """测试高64位相同的两个摘要不会互相冲突"""
+        manager = UserManager(str(tmp_path))
+        alice = manager.create_user('alice', 'alice@test.com', 'pw')[0]
+        bob = manager.create_user('bob', 'bob@test.com', 'pw')[0]
+        manager.tokens.clear()
+        manager.token_expiry.clear()
+        
+        expires = time.time_ns() + 10**12
+        key_a = b'\x01' * 8 + b'\x02' * 8
+        key_b = b'\x01' * 8 + b'\x03' * 8
+        manager.tokens[key_a] = alice.user_id
+        manager.tokens[key_b] = bob.user_id
+        manager.token_expiry[key_a] = manager.token_expiry[key_b] = expires
+        manager._compact_tokens()
+        
+        now = time.time_ns()
+        assert manager._lookup_token(key_a, now)[0] is alice
+        assert manager._lookup_token(key_b, now)[0] is bob
+        assert manager._lookup_token(b'\x01' * 8 + b'\x04' * 8, now)[0] is None
+        print("✓ Token table full digest test passed")
+
+
+class TestUserIndex:
+    """用户名/邮箱索引测试"""
+    
+    def test_update_rejects_taken_username(self, tmp_path):
+        """测试改成其他用户的用户名/邮箱时拒绝更新, 且索引保持不变"""
+        manager = UserManager(str(tmp_path))
+        alice = manager.create_user('alice', 'alice@test.com', 'pw')[0]
+        bob = manager.create_user('bob', 'bob@test.com', 'pw')[0]
+        
+        with pytest.raises(ValueError):
+            manager.update_user(bob.user_id, username='alice')
+        with pytest.raises(ValueError):
+            manager.update_user(bob.user_id, email='alice@test.com')
+        
+        assert bob.username == 'bob' and bob.email == 'bob@test.com'
+        assert manager.get_user_by_username('alice') is alice
+        assert manager.login('alice', 'pw')[0] is alice
+        
+        manager.update_user(bob.user_id, username='robert')
+        assert manager.get_user_by_username('robert') is bob
+        assert manager.get_user_by_username('bob') is None
+        print("✓ Update user uniqueness test passed")
@@ -50,6 +50,18 @@ class TestOscillator:
         assert audio.max() <= 1.0
         print("✓ Triangle wave test passed")
     
+    def test_noise_wave(self):
+        """测试白噪声生成"""
+        osc = Oscillator(wave_type='noise')
+        audio = osc.generate(duration=0.1)
+        
+        assert len(audio) == int(0.1 * 44100)
+        assert audio.dtype == np.float32
+        assert audio.min() >= -1.0
+        assert audio.max() < 1.0
+        assert np.std(audio) > 0.5
+        print("✓ Noise wave test passed")
+    
     def test_frequency_change(self):
         """测试频率改变"""
         osc = Oscillator(frequency=440.0)
@@ -58,6 +70,35 @@ class TestOscillator:
         assert osc.frequency == 880.0
         assert osc.phase_increment == 2 * np.pi * 880.0 / 44100
         print("✓ Frequency change test passed")
+    
+    def test_generate_into_buffer(self):
+        """测试写入预分配缓冲区与直接生成一致"""
+        for wave_type in ['sine', 'square', 'sawtooth', 'triangle']:
+            osc = Oscillator(frequency=440.0, wave_type=wave_type)
+            buf = np.empty(int(0.05 * 44100))
+            audio = osc.generate(duration=0.05, out=buf)
+            
+            assert audio is buf
+            assert np.array_equal(audio, osc.generate(duration=0.05))
+        print("✓ Generate into buffer test passed")
+
+    def test_generate_from_freq(self):
+        """测试逐样本频率批量生成与process_sample一致"""
+        freq = np.linspace(220.0, 880.0, 1000)
+        
+        ref_osc = Oscillator(frequency=220.0, wave_type='sawtooth')
+        expected = []
+        for f in freq:
+            ref_osc.set_frequency(f)
+            expected.append(ref_osc.process_sample())
+        
+        osc = Oscillator(frequency=220.0, wave_type='sawtooth')
+        audio = osc.generate_from_freq(freq)
+        
+        assert len(audio) == len(freq)
+        assert np.allclose(audio, expected)
+        assert np.isclose(osc.phase, ref_osc.phase)
+        print("✓ Generate from frequency test passed")
 
 
 class TestFilter:
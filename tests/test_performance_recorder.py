@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# 🎙️ Modular Synth - 演奏录音器测试
+
+import sys
+sys.path.insert(0, '..')
+
+from audio.performance_recorder import PerformanceRecorder
+
+
+class TestPerformanceRecorder:
+    """演奏录音器测试"""
+    
+    def test_note_on_off_stop(self):
+        """测试按下/释放/停止录音生成正确的音符事件"""
+        recorder = PerformanceRecorder()
+        recorder.start_recording("test")
+        
+        recorder.record_note_on(60, 100)
+        recorder.record_note_on(64, 80, channel=1)
+        assert recorder.active_notes == {60: 100, 64: 80}
+        recorder.record_note_off(60)
+        assert 60 not in recorder.active_notes and 60 not in recorder.note_start_times
+        recorder.record_note_off(64, channel=1)
+        recorder.record_note_on(67, 90)
+        
+        track = recorder.stop_recording()
+        assert [(e.note, e.velocity) for e in track.events] == [(60, 100), (64, 80), (67, 90)]
+        assert track.events[1].channel == 1
+        assert all(e.duration >= 0 for e in track.events)
+        assert track.events[0].start_time <= track.events[1].start_time <= track.events[2].start_time
+        assert recorder.get_track_count() == 1
+        print("✓ Note on/off/stop test passed")
+    
+    def test_untracked_note_off_ignored(self):
+        """测试未按下的音符释放时既不记录也不回调"""
+        recorder = PerformanceRecorder()
+        calls = []
+        recorder.on_note_on = lambda note, velocity, channel: calls.append(('on', note))
+        recorder.on_note_off = lambda note, channel: calls.append(('off', note))
+        recorder.start_recording("test")
+        
+        recorder.record_note_off(72)
+        recorder.record_note_on(60, 100)
+        recorder.record_note_off(60)
+        recorder.record_note_off(60)
+        
+        track = recorder.stop_recording()
+        assert [e.note for e in track.events] == [60]
+        # 停止录音时剩余回调已全部派发
+        assert calls == [('on', 60), ('off', 60)]
+        print("✓ Untracked note off test passed")
+    
+    def test_not_recording(self):
+        """测试未录音时不记录音符"""
+        recorder = PerformanceRecorder()
+        recorder.record_note_on(60, 100)
+        recorder.record_note_off(60)
+        assert not recorder.active_notes
+        assert recorder.stop_recording() is None
+        print("✓ Not recording test passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# 🎛️ Modular Synth - 预设管理器测试
+
+import sys
+sys.path.insert(0, '..')
+
+from audio.preset_manager import Preset, PresetLibrary
+
+QUERIES = ['', 'a', 'le', 'lead', 'saw', 'Saw', 'synth', 'retro', '80s', '锯齿波', '主音',
+           'pad', 'bass', 'xyz', 'classic saw', 'new', 'renamed', 'custom']
+
+
+def linear_search(library, query):
+    """原先的线性扫描搜索, 作为参考结果"""
+    query = query.lower()
+    return [preset for preset in library.presets.values()
+            if (query in preset.name.lower() or
+                query in preset.description.lower() or
+                any(query in tag.lower() for tag in preset.tags))]
+
+
+def make_preset(name, category, description, tags):
+    """创建带描述和标签的预设"""
+    preset = Preset(name, category)
+    preset.description = description
+    preset.tags = tags
+    return preset
+
+
+class TestPresetSearch:
+    """预设搜索索引测试"""
+    
+    def assert_matches_linear(self, library):
+        for query in QUERIES:
+            assert library.search_presets(query) == linear_search(library, query), query
+    
+    def test_search_matches_linear_scan(self):
+        """测试三元组索引搜索与线性扫描结果 (包括顺序) 一致"""
+        library = PresetLibrary()
+        self.assert_matches_linear(library)
+        print("✓ Preset search test passed")
+    
+    def test_search_after_add_remove_update(self):
+        """测试增删/替换预设后索引与类别结果保持一致"""
+        library = PresetLibrary()
+        self.assert_matches_linear(library)
+        first = next(iter(library.presets))
+        
+        library.add_preset(make_preset('New Pad', 'Pad', 'custom warm pad', ['new', 'soft']))
+        self.assert_matches_linear(library)
+        
+        library.remove_preset(first)
+        self.assert_matches_linear(library)
+        assert library.get_preset(first) is None
+        
+        # 同名预设替换 (类别也随之改变)
+        library.add_preset(make_preset('New Pad', 'Bass', 'renamed bass', ['custom']))
+        self.assert_matches_linear(library)
+        
+        for category in library.get_categories()[1:]:
+            expected = [p for p in library.presets.values() if p.category == category]
+            assert library.get_presets_by_category(category) == expected
+        assert 'New Pad' not in [p.name for p in library.get_presets_by_category('Pad')]
+        assert set(library.get_categories()[1:]) == {p.category for p in library.presets.values()}
+        print("✓ Preset search update test passed")
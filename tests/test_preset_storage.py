@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# ☁️ Modular Synth - 云端预设存储测试
+
+import sys
+sys.path.insert(0, '..')
+
+from cloud.preset_storage import PresetCloudStorage
+
+QUERIES = ['', 'a', 'pa', 'pad', 'lead', 'bass', 'warm', 'Warm', 'dark', 'ambient', 'xyz',
+           'renamed', 'glitch']
+
+
+def linear_search(storage, query, limit=20):
+    """原先的线性扫描搜索, 作为参考结果"""
+    query = query.lower()
+    results = []
+    for preset in storage.presets.values():
+        if not preset.is_public:
+            continue
+        if (query in preset.name.lower() or
+            query in preset.description.lower() or
+            query in preset.category.lower() or
+            any(query in tag.lower() for tag in preset.tags)):
+            results.append(preset)
+    return results[:limit]
+
+
+def linear_list(storage, category=None, tags=None, limit=50, sort_by="created_at"):
+    """原先的线性扫描过滤, 作为参考结果"""
+    presets = [p for p in storage.presets.values() if p.is_public]
+    if category:
+        presets = [p for p in presets if p.category.lower() == category.lower()]
+    if tags:
+        presets = [p for p in presets if any(t in p.tags for t in tags)]
+    if sort_by == "likes":
+        presets.sort(key=lambda p: p.likes, reverse=True)
+    else:
+        presets.sort(key=lambda p: p.created_at, reverse=True)
+    return presets[:limit]
+
+
+def fill(storage):
+    """创建一组公开/私有预设"""
+    specs = [
+        ('Warm Pad', 'soft ambient pad', 'Pad', ['warm', 'ambient'], True),
+        ('Dark Bass', 'deep sub bass', 'Bass', ['dark'], True),
+        ('Glass Lead', 'bright lead', 'Lead', ['bright', 'warm'], True),
+        ('Secret Pad', 'private warm pad', 'Pad', ['warm'], False),
+        ('Ambient Drone', 'dark ambient texture', 'pad', ['ambient', 'dark'], True),
+    ]
+    presets = []
+    for i, (name, desc, category, tags, public) in enumerate(specs):
+        preset = storage.create_preset(f'user{i % 2}', name, desc, category, tags, {'osc': i}, is_public=public)
+        preset.likes = i * 3 % 5
+        presets.append(preset)
+    return presets
+
+
+class TestPresetIndexes:
+    """标签/类别/三元组索引测试"""
+    
+    def assert_matches_linear(self, storage):
+        for query in QUERIES:
+            assert storage.search_presets(query) == linear_search(storage, query), query
+            assert storage.search_presets(query, limit=1) == linear_search(storage, query, limit=1), query
+        for category in (None, 'pad', 'PAD', 'bass', 'missing'):
+            for tags in (None, ['warm'], ['dark', 'bright'], ['missing']):
+                for sort_by in ('created_at', 'likes'):
+                    expected = linear_list(storage, category, tags, sort_by=sort_by)
+                    assert storage.list_public_presets(category, tags, sort_by=sort_by) == expected, (category, tags)
+    
+    def test_indexes_match_linear_scan(self, tmp_path):
+        """测试索引查询与线性扫描结果 (包括顺序) 一致"""
+        storage = PresetCloudStorage(str(tmp_path))
+        fill(storage)
+        self.assert_matches_linear(storage)
+        print("✓ Cloud preset index test passed")
+    
+    def test_indexes_after_update_delete(self, tmp_path):
+        """测试新增/更新/删除预设后索引保持一致"""
+        storage = PresetCloudStorage(str(tmp_path))
+        presets = fill(storage)
+        
+        storage.update_preset(presets[0].preset_id, 'user0', name='Renamed Pad', tags=['glitch'])
+        self.assert_matches_linear(storage)
+        assert storage.search_presets('warm pad') == []
+        
+        storage.update_preset(presets[3].preset_id, 'user1', is_public=True)
+        self.assert_matches_linear(storage)
+        
+        assert storage.delete_preset(presets[1].preset_id, 'user1')
+        self.assert_matches_linear(storage)
+        assert storage.list_public_presets(category='bass') == []
+        
+        storage.create_preset('user2', 'Late Bass', 'added later', 'Bass', ['dark'], {})
+        self.assert_matches_linear(storage)
+        print("✓ Cloud preset index update test passed")